@@ -0,0 +1,29 @@
+"""Add posts keyset pagination index
+
+Revision ID: 3f1a9c2d7b64
+Revises: 698bcc106b40
+Create Date: 2026-10-17 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2d7b64'
+down_revision: Union[str, Sequence[str], None] = '698bcc106b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves ORDER BY date DESC, id DESC and the (date, id) < (...) cursor predicate
+    op.create_index('ix_posts_date_id', 'posts', ['date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_date_id', table_name='posts')
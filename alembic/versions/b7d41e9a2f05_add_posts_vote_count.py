@@ -0,0 +1,36 @@
+"""Add denormalized posts.vote_count
+
+Revision ID: b7d41e9a2f05
+Revises: 8c5e2b71d0a3
+Create Date: 2026-10-17 11:26:54.017733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41e9a2f05'
+down_revision: Union[str, Sequence[str], None] = '8c5e2b71d0a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('vote_count', sa.Integer(), server_default='0', nullable=False))
+    # Backfill from the votes table; scripts/reconcile_vote_counts.py repairs later drift
+    op.execute(
+        'UPDATE posts SET vote_count = v.cnt '
+        'FROM (SELECT post_id, count(*) AS cnt FROM votes GROUP BY post_id) AS v '
+        'WHERE posts.id = v.post_id'
+    )
+    op.create_index('ix_posts_vote_count_id', 'posts', ['vote_count', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_vote_count_id', table_name='posts')
+    op.drop_column('posts', 'vote_count')
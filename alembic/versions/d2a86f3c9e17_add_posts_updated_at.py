@@ -0,0 +1,29 @@
+"""Add posts.updated_at for ETag / Last-Modified
+
+Revision ID: d2a86f3c9e17
+Revises: b7d41e9a2f05
+Create Date: 2026-10-17 12:40:07.382164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a86f3c9e17'
+down_revision: Union[str, Sequence[str], None] = 'b7d41e9a2f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('updated_at', sa.DateTime(), server_default=sa.text('NOW()'), nullable=False))
+    op.execute('UPDATE posts SET updated_at = date')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('posts', 'updated_at')
@@ -1,5 +1,11 @@
+import hashlib
 import os
+import stat
 import json
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
 from typing import Optional
 from pydantic_settings import BaseSettings
 
@@ -10,14 +16,94 @@ class Settings(BaseSettings):
     # Database Configuration
     database_url: str
     database_echo: bool = True
+    # Use an AsyncEngine (psycopg async) for request sessions instead of the sync engine
+    database_async: bool = False
+    # Ping pooled connections at checkout only when idle at least this long (0 = every
+    # checkout, like pool_pre_ping; negative = never)
+    database_ping_idle_seconds: float = 30.0
+    # Schema handling at startup: create_all (create missing tables), alembic (only verify the
+    # database is at the migration head - use in production) or none
+    db_schema_mode: str = "create_all"
+    # Comma-separated read replica URLs; GET routes read from them when set
+    database_replica_urls: str = ""
+    # round_robin or least_loaded (fewest checked-out connections)
+    replica_strategy: str = "round_robin"
+    # Replicas further behind than this are skipped (all lagging = read from primary)
+    replica_max_lag_seconds: float = 10.0
+    replica_lag_check_seconds: float = 5.0
+    # Reads stay on the primary this long after a client's write (read-your-writes)
+    replica_sticky_seconds: float = 5.0
+    # Search mode for GET /posts?search=: fulltext (tsvector), trigram (pg_trgm) or like
+    posts_search_mode: str = "fulltext"
     
     # Security & Authentication
     paseto_secret_key: str
     access_token_expire_minutes: int = 30
+    # username: tokens carry only the username and every request looks the user up.
+    # claims: tokens carry user id, username and email, so CurrentPrincipal needs no
+    # query; they live claims_access_token_minutes and are renewed with a refresh token
+    access_token_format: str = "username"
+    claims_access_token_minutes: int = 5
+    refresh_token_expire_days: int = 14
+    # How often each worker reloads revoked access tokens (logout) from the database
+    token_revocation_sync_seconds: float = 10.0
+    
+    # Verified-token cache: lets recently seen tokens skip the PASETO decrypt (and the user lookup)
+    token_cache_enabled: bool = True
+    token_cache_max_size: int = 10000
+    token_cache_ttl_seconds: int = 300
+    
+    # Argon2 worker pool (requests beyond workers + queue limit get a 503)
+    password_hash_workers: int = 4
+    password_hash_queue_limit: int = 32
+    
+    # Argon2 cost parameters (tune with scripts/calibrate_argon2.py)
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536
+    argon2_parallelism: int = 4
+    
+    # Connection pool for the raw psycopg helpers in app/utils/db_sql.py (per db_config.json env)
+    raw_db_pool_min_size: int = 1
+    raw_db_pool_max_size: int = 10
+    raw_db_pool_timeout: float = 30.0
     
     # Application Settings
     app_env: str = "development"
     debug: bool = True
+    # Debug only: fail requests that run more SQL statements than this (0 = off)
+    sql_statement_budget: int = 0
+    
+    # Write-behind vote ingestion for POST /votes
+    vote_buffer_enabled: bool = False
+    vote_buffer_flush_ms: int = 5
+    vote_buffer_max_batch: int = 500
+    
+    # Response cache for post and user reads: none, memory (per worker), shared (one
+    # memory-mapped file for all workers on the host) or redis (shared)
+    post_cache_backend: str = "none"
+    post_cache_ttl_seconds: int = 30
+    post_cache_max_entries: int = 10000
+    # shared backend: bytes per slot (larger responses are not cached) and the file
+    # (default /dev/shm/kpi-one-cache-<APP_ENV>)
+    shared_cache_slot_bytes: int = 16384
+    shared_cache_path: str = ""
+    redis_url: str = "redis://localhost:6379/0"
+    # Most ids accepted by GET/POST /posts/batch
+    posts_batch_max_ids: int = 100
+    # POST /posts/bulk: most items and body bytes per request, and rows per multi-row INSERT
+    posts_bulk_max_items: int = 5000
+    posts_bulk_max_bytes: int = 16 * 1024 * 1024
+    posts_bulk_chunk_size: int = 500
+    # Rows fetched per server-side cursor round trip by GET /posts/export
+    posts_export_batch_size: int = 1000
+    # Serialize post reads straight to JSON bytes (see scripts/bench_serialization.py)
+    fast_json_responses: bool = False
+    
+    # Warn when a worker takes longer than this to start (0 = no target)
+    startup_target_ms: int = 0
+    
+    # Prometheus metrics middleware and GET /metrics
+    metrics_enabled: bool = True
     
     # CORS Settings
     cors_origins: str = "http://localhost:3000,http://localhost:8080"
@@ -29,6 +115,9 @@ class Settings(BaseSettings):
     aws_secrets_enabled: bool = False
     aws_secret_name: Optional[str] = None
     aws_region: str = "us-east-1"
+    # Share a fetched secret between workers through a local file for this long (0 = off)
+    aws_secrets_cache_ttl_seconds: int = 0
+    aws_secrets_cache_dir: Optional[str] = None
     
     class Config:
         # Dynamically load environment-specific .env file from config/ directory
@@ -38,19 +127,104 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
-def load_secrets_from_aws(settings_obj: Settings) -> Settings:
+def _secret_cache_path(settings_obj: Settings) -> Path:
+    """Cache file shared by the workers of one host for one secret."""
+    key = hashlib.sha256(f"{settings_obj.aws_region}:{settings_obj.aws_secret_name}".encode()).hexdigest()[:16]
+    return Path(settings_obj.aws_secrets_cache_dir or tempfile.gettempdir()) / f"kpi-one-secret-{key}.json"
+
+
+def _read_secret_cache(settings_obj: Settings, remove_expired: bool = False) -> Optional[dict]:
     """
-    Load secrets from AWS Secrets Manager and override settings.
-    
-    Args:
-        settings_obj: Settings instance to update
-        
-    Returns:
-        Updated settings with values from AWS Secrets Manager
+    Return the cached secret if caching is on and the file is younger than the TTL.
+
+    The default directory is shared (/tmp), so a file is only trusted when it is a
+    regular file owned by this user and not accessible to anyone else. With
+    ``remove_expired`` (only under the cache lock) an expired file is deleted.
     """
-    if not settings_obj.aws_secrets_enabled or not settings_obj.aws_secret_name:
-        return settings_obj
-    
+    if settings_obj.aws_secrets_cache_ttl_seconds <= 0:
+        return None
+    path = _secret_cache_path(settings_obj)
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    except OSError:
+        return None
+    try:
+        with os.fdopen(fd) as f:
+            st = os.fstat(f.fileno())
+            if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+                print(f"Warning: ignoring AWS secret cache {path}: not a private file owned by this user")
+                return None
+            if time.time() - st.st_mtime > settings_obj.aws_secrets_cache_ttl_seconds:
+                # Don't leave an expired plaintext secret lying around
+                if remove_expired:
+                    os.unlink(path)
+                return None
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_secret_cache(settings_obj: Settings, secret: dict) -> None:
+    """Atomically write the secret to the cache file, readable by the owner only."""
+    if settings_obj.aws_secrets_cache_ttl_seconds <= 0:
+        return
+    path = _secret_cache_path(settings_obj)
+    tmp = None
+    try:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".kpi-one-secret-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(secret, f)
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Warning: could not cache AWS secret: {e}")
+        if tmp is not None:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+@contextmanager
+def _secret_cache_lock(settings_obj: Settings):
+    """
+    Hold an exclusive lock on the cache's ``.lock`` file, so that of the workers
+    starting together only the first fetches from AWS and the rest read its file.
+
+    Does nothing when caching is off, and carries on unlocked when the lock file
+    cannot be used (no fcntl, or not a private file owned by this user).
+    """
+    if settings_obj.aws_secrets_cache_ttl_seconds <= 0:
+        yield
+        return
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    path = _secret_cache_path(settings_obj).with_suffix(".lock")
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    except OSError as e:
+        print(f"Warning: could not open AWS secret cache lock {path}: {e}")
+        yield
+        return
+    try:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+            print(f"Warning: ignoring AWS secret cache lock {path}: not a private file owned by this user")
+            yield
+            return
+        fcntl.lockf(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.lockf(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def _fetch_secret_from_aws(settings_obj: Settings) -> Optional[dict]:
+    """Fetch and parse the secret from AWS Secrets Manager (None on any failure)."""
     try:
         import boto3
         from botocore.exceptions import ClientError
@@ -68,32 +242,66 @@ def load_secrets_from_aws(settings_obj: Settings) -> Settings:
             )
         except ClientError as e:
             print(f"Error fetching secret from AWS: {e}")
-            return settings_obj
+            return None
         
         # Parse the secret
         if 'SecretString' in get_secret_value_response:
-            secret = json.loads(get_secret_value_response['SecretString'])
-            
-            # Override settings with values from AWS Secrets Manager
-            # Map AWS secret keys to settings attributes
-            secret_mapping = {
-                'DATABASE_URL': 'database_url',
-                'PASETO_SECRET_KEY': 'paseto_secret_key',
-                'ACCESS_TOKEN_EXPIRE_MINUTES': 'access_token_expire_minutes',
-                'CORS_ORIGINS': 'cors_origins',
-            }
-            
-            for aws_key, settings_attr in secret_mapping.items():
-                if aws_key in secret:
-                    setattr(settings_obj, settings_attr, secret[aws_key])
-            
-            print("✓ Loaded secrets from AWS Secrets Manager")
+            return json.loads(get_secret_value_response['SecretString'])
         
     except ImportError:
         print("Warning: boto3 not installed. Install with: pip install boto3")
     except Exception as e:
         print(f"Error loading AWS secrets: {e}")
     
+    return None
+
+
+def load_secrets_from_aws(settings_obj: Settings) -> Settings:
+    """
+    Load secrets from AWS Secrets Manager and override settings.
+    
+    With AWS_SECRETS_CACHE_TTL_SECONDS > 0 the fetched secret is kept in a local
+    file (mode 0600) for that long. Workers that miss it take a lock and check it
+    again, so sibling workers starting together make one Secrets Manager round
+    trip instead of one each.
+    
+    Args:
+        settings_obj: Settings instance to update
+        
+    Returns:
+        Updated settings with values from AWS Secrets Manager
+    """
+    if not settings_obj.aws_secrets_enabled or not settings_obj.aws_secret_name:
+        return settings_obj
+    
+    secret = _read_secret_cache(settings_obj)
+    source = "local cache"
+    if secret is None:
+        with _secret_cache_lock(settings_obj):
+            # Another worker may have fetched it while we waited for the lock
+            secret = _read_secret_cache(settings_obj, remove_expired=True)
+            if secret is None:
+                secret = _fetch_secret_from_aws(settings_obj)
+                source = "AWS Secrets Manager"
+                if secret is None:
+                    return settings_obj
+                _write_secret_cache(settings_obj, secret)
+    
+    # Override settings with values from AWS Secrets Manager
+    # Map AWS secret keys to settings attributes
+    secret_mapping = {
+        'DATABASE_URL': 'database_url',
+        'DATABASE_REPLICA_URLS': 'database_replica_urls',
+        'PASETO_SECRET_KEY': 'paseto_secret_key',
+        'ACCESS_TOKEN_EXPIRE_MINUTES': 'access_token_expire_minutes',
+        'CORS_ORIGINS': 'cors_origins',
+    }
+    
+    for aws_key, settings_attr in secret_mapping.items():
+        if aws_key in secret:
+            setattr(settings_obj, settings_attr, secret[aws_key])
+    
+    print(f"✓ Loaded secrets from {source}")
     return settings_obj
 
 
@@ -122,4 +330,7 @@ def get_settings() -> Settings:
 
 
 # Create a global settings instance
+_settings_started = time.perf_counter()
 settings = get_settings()
+# Reported in the startup timing breakdown (app/main.py)
+settings_load_seconds = time.perf_counter() - _settings_started
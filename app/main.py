@@ -1,18 +1,78 @@
-from fastapi import FastAPI
+import time
+
+# Start of the app import, for the startup timing breakdown
+_import_started = time.perf_counter()
+
+import asyncio
+import os
+
+from fastapi import FastAPI, Request
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 
-from .config import settings
-from .models.db_orm import create_db_and_tables
+from .config import settings, settings_load_seconds
+from .models.db_orm import async_engine, async_replica_engines, engine, prepare_schema, replica_engines, replica_router
+from .models.replicas import READ_PRIMARY_COOKIE, is_write_request
 from .routers import auth_router, posts_router, users_router, votes_router
+from .utils.db_sql import close_pools
+from .utils.hashing import hashing_pool
 from .utils.helpers import AppException, app_exception_handler
+from .utils.metrics import mark_worker_dead, metrics_endpoint, record_request_metrics
+from .utils.revocation import revocation_enabled, revocation_list
+from .utils.sql_stats import instrument_engine, statement_budget, track_statements
+from .utils.vote_buffer import vote_buffer
+
+def reset_startup_clock() -> None:
+    """Time startup from now; used by forked workers of a preloaded app (run.py --production)."""
+    global _import_started, _imported_at, settings_load_seconds
+    _import_started = _imported_at = time.perf_counter()
+    settings_load_seconds = 0.0
+
+def report_startup(phases: dict[str, float]) -> None:
+    """Print this worker's startup time per phase; warn if STARTUP_TARGET_MS is exceeded."""
+    total_ms = (time.perf_counter() - _import_started) * 1000
+    breakdown = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in phases.items())
+    print(f"Worker {os.getpid()} started in {total_ms:.0f} ms ({breakdown})")
+    if settings.startup_target_ms and total_ms > settings.startup_target_ms:
+        print(f"Warning: startup took {total_ms:.0f} ms, above STARTUP_TARGET_MS={settings.startup_target_ms}")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    create_db_and_tables()
+    started = time.perf_counter()
+    prepare_schema()
+    schema_seconds = time.perf_counter() - started
+    lag_monitor = None
+    if replica_router.enabled:
+        lag_monitor = asyncio.create_task(replica_router.monitor(settings.replica_lag_check_seconds))
+    revocation_monitor = None
+    if revocation_enabled:
+        await revocation_list.sync()
+        revocation_monitor = asyncio.create_task(revocation_list.monitor(settings.token_revocation_sync_seconds))
+    report_startup({
+        "settings": settings_load_seconds,
+        "imports": _imported_at - _import_started - settings_load_seconds,
+        "until lifespan": started - _imported_at,
+        f"schema ({settings.db_schema_mode})": schema_seconds,
+        "other startup": time.perf_counter() - started - schema_seconds,
+    })
     yield
-    # Shutdown (optional cleanup code here)
+    # Shutdown
+    if lag_monitor is not None:
+        lag_monitor.cancel()
+    if revocation_monitor is not None:
+        revocation_monitor.cancel()
+    await vote_buffer.close()
+    hashing_pool.shutdown()
+    close_pools()
+    if settings.metrics_enabled:
+        mark_worker_dead()
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
+    for replica in replica_engines:
+        replica.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -25,9 +85,49 @@ app.add_middleware(
 	allow_credentials=True,
 	allow_methods=["*"],
 	allow_headers=["*"],
-	expose_headers=["Content-Type", "Authorization"],
+	expose_headers=["Content-Type", "Authorization", "X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
+instrument_engine(engine)
+if async_engine is not None:
+	instrument_engine(async_engine.sync_engine)
+for replica in replica_engines:
+	instrument_engine(replica)
+for replica in async_replica_engines:
+	instrument_engine(replica.sync_engine)
+
+if replica_router.enabled:
+	@app.middleware("http")
+	async def read_your_writes(request: Request, call_next):
+		"""After a successful write, pin this client's reads to the primary for REPLICA_STICKY_SECONDS."""
+		response = await call_next(request)
+		if is_write_request(request) and response.status_code < 400:
+			until = time.time() + settings.replica_sticky_seconds
+			response.set_cookie(READ_PRIMARY_COOKIE, f"{until:.3f}", max_age=max(1, round(settings.replica_sticky_seconds)), httponly=True, samesite="lax")
+		return response
+
+if settings.debug:
+	@app.middleware("http")
+	async def count_sql_statements(request: Request, call_next):
+		"""Report the SQL statements a request ran; enforce SQL_STATEMENT_BUDGET if set.
+
+		A page of posts must cost the same number of statements whatever its size,
+		so an N+1 regression shows up as a growing X-SQL-Statements value.
+		"""
+		if settings.sql_statement_budget:
+			with statement_budget(settings.sql_statement_budget) as stats:
+				response = await call_next(request)
+		else:
+			with track_statements() as stats:
+				response = await call_next(request)
+		response.headers["X-SQL-Statements"] = str(stats.count)
+		return response
+
+if settings.metrics_enabled:
+	# Added last so it wraps the other middleware and times the whole request
+	app.middleware("http")(record_request_metrics)
+	app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
 app.add_exception_handler(AppException, app_exception_handler)
 app.include_router(auth_router)
 app.include_router(posts_router)
@@ -40,4 +140,7 @@ async def read_root():
 	This is the root endpoint, useful for sanity checking that the
 	application is up and running.
 	"""
-	return {"Hello": "Welcome to KPI One"}
\ No newline at end of file
+	return {"Hello": "Welcome to KPI One"}
+
+
+_imported_at = time.perf_counter()
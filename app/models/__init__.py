@@ -7,6 +7,7 @@ from .users import (
 from .db_orm import get_session
 from .votes import Votes
 from .posts import Posts
+from .tokens import RefreshToken, RevokedToken
 
 __all__ = [
     "get_session",
@@ -16,4 +17,6 @@ __all__ = [
 	"get_user_by_username_db",
 	"Votes",
 	"Posts",
+	"RefreshToken",
+	"RevokedToken",
 ]
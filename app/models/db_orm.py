@@ -1,20 +1,105 @@
-from typing import Annotated
+from pathlib import Path
+from typing import Annotated, Callable, TypeVar, Union
 
-from fastapi import Depends
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from ..config import settings
+from .pool import install_idle_pre_ping, record_session_usage
+from .replicas import READ_PRIMARY_COOKIE, ReplicaRouter, is_sticky
+
+T = TypeVar("T")
 
 engine = create_engine(
     settings.database_url, 
     echo=settings.database_echo,
-    pool_pre_ping=True  # Verify connections are alive before using them
 )   
 
+# The async engine is only built when enabled so the sync path needs no async driver setup
+async_engine = create_async_engine(
+    settings.database_url,
+    echo=settings.database_echo,
+) if settings.database_async else None
+
+replica_urls = [url.strip() for url in settings.database_replica_urls.split(",") if url.strip()]
+# Sync replica engines serve sync read sessions and always probe replication lag
+replica_engines = [
+    create_engine(url, echo=settings.database_echo)
+    for url in replica_urls
+]
+async_replica_engines = [
+    create_async_engine(url, echo=settings.database_echo)
+    for url in replica_urls
+] if settings.database_async else []
+
+# Verify connections are alive before using them, but only those idle past DATABASE_PING_IDLE_SECONDS
+for _engine in [engine, *replica_engines]:
+    install_idle_pre_ping(_engine, settings.database_ping_idle_seconds)
+for _engine in ([async_engine] if async_engine is not None else []) + async_replica_engines:
+    install_idle_pre_ping(_engine.sync_engine, settings.database_ping_idle_seconds)
+
+replica_router = ReplicaRouter(
+    async_engine if settings.database_async else engine,
+    async_replica_engines if settings.database_async else replica_engines,
+    replica_engines,
+    strategy=settings.replica_strategy,
+    max_lag_seconds=settings.replica_max_lag_seconds,
+)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+def dispose_inherited_pools():
+    """
+    Drop connections a forked worker inherited from the master's engines.
+
+    ``close=False`` leaves the sockets to the parent; the child just starts
+    with empty pools (needed when the app is preloaded before forking).
+    """
+    engine.dispose(close=False)
+    for replica in replica_engines:
+        replica.dispose(close=False)
+    for async_eng in ([async_engine] if async_engine is not None else []) + async_replica_engines:
+        async_eng.sync_engine.dispose(close=False)
+
 def create_db_and_tables():
     """Create all tables from SQLModel metadata."""
     SQLModel.metadata.create_all(engine)
 
+def check_schema_revision():
+    """
+    Fail startup unless the database is at the Alembic head revision.
+
+    Costs one query against ``alembic_version``, where ``create_all`` inspects
+    every table.
+    """
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    heads = set(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads())
+    with engine.connect() as conn:
+        current = set(MigrationContext.configure(conn).get_current_heads())
+    if current != heads:
+        raise RuntimeError(
+            f"Database schema is at {sorted(current) or 'no revision'}, code expects {sorted(heads)}; "
+            "run `alembic upgrade head`"
+        )
+
+def prepare_schema():
+    """Apply DB_SCHEMA_MODE: create_all (development), alembic (head check only) or none."""
+    if settings.db_schema_mode == "create_all":
+        create_db_and_tables()
+    elif settings.db_schema_mode == "alembic":
+        check_schema_revision()
+
+# The session dependencies are lazy: a Session checks out a pool connection only at
+# its first statement, so a request rejected by validation or auth, or answered from
+# the cache, never touches the pool. Nothing here may run SQL before the yield.
+# record_session_usage counts the sessions that never needed a connection.
+
 def get_session():
     with Session(
         engine, 
@@ -22,11 +107,75 @@ def get_session():
         autoflush=True,
         expire_on_commit=False  # Keep objects attached after commit when working with existing tables
     ) as session:
-        yield session
+        try:
+            yield session
+        finally:
+            record_session_usage(session)
+
+async def get_async_session():
+    async with AsyncSession(
+        async_engine,
+        autoflush=True,
+        expire_on_commit=False
+    ) as session:
+        try:
+            yield session
+        finally:
+            record_session_usage(session.sync_session)
+
+def get_read_session(request: Request):
+    """Session for read-only work: a fresh replica, or the primary right after this client wrote."""
+    bind = replica_router.pick(sticky=is_sticky(request.cookies.get(READ_PRIMARY_COOKIE)))
+    with Session(bind, autoflush=False, expire_on_commit=False) as session:
+        try:
+            yield session
+        finally:
+            record_session_usage(session)
+
+async def get_async_read_session(request: Request):
+    bind = replica_router.pick(sticky=is_sticky(request.cookies.get(READ_PRIMARY_COOKIE)))
+    async with AsyncSession(bind, autoflush=False, expire_on_commit=False) as session:
+        try:
+            yield session
+        finally:
+            record_session_usage(session.sync_session)
 
 SessionDep = Annotated[Session, Depends(get_session)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+
+# Session dependency used by the routers, selected by DATABASE_ASYNC
+get_db_session = get_async_session if settings.database_async else get_session
+DBSessionDep = Annotated[Union[Session, AsyncSession], Depends(get_db_session)]
+# Read-only counterpart for GET routes; same as get_db_session when no replicas are configured
+get_db_read_session = get_async_read_session if settings.database_async else get_read_session
+ReadDBSessionDep = Annotated[Union[Session, AsyncSession], Depends(get_db_read_session)]
+
+
+async def run_db(session: Union[Session, AsyncSession], fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a model helper without blocking the event loop.
+
+    Helpers are written against a sync ``Session`` passed as ``session=``. With an
+    ``AsyncSession`` they run through ``run_sync`` on the async driver; with a sync
+    ``Session`` they run in the threadpool.
+    """
+    if isinstance(session, AsyncSession):
+        return await session.run_sync(lambda sync_session: fn(*args, session=sync_session, **kwargs))
+    return await run_in_threadpool(fn, *args, session=session, **kwargs)
+
+async def run_db_in_new_session(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a model helper in a session of its own, for work that is not tied to a request."""
+    if async_engine is not None:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            return await run_db(session, fn, *args, **kwargs)
+
+    def _call() -> T:
+        with Session(engine, expire_on_commit=False) as session:
+            return fn(*args, session=session, **kwargs)
+
+    return await run_in_threadpool(_call)
 
 class BaseModel(SQLModel):
     """Base model class with global table configuration"""
     __table_args__ = {"extend_existing": True}  # Use existing table if it already exists
-    
\ No newline at end of file
+    
@@ -0,0 +1,83 @@
+import time
+
+from prometheus_client import Counter
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of a pool")
+PINGS = Counter("db_pool_pings_total", "Checkouts that pinged the connection (idle past the threshold)")
+PINGS_SKIPPED = Counter("db_pool_pings_skipped_total", "Checkouts that skipped the ping (recently used)")
+SESSIONS = Counter("db_sessions_total", "Request sessions opened")
+SESSIONS_WITHOUT_CONNECTION = Counter(
+    "db_sessions_without_connection_total", "Request sessions that ended without checking out a connection"
+)
+
+
+class ConnectionStats:
+    """Per-worker totals behind the Prometheus counters above (handy in a shell or a test)."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.pings = 0
+        self.pings_skipped = 0
+        self.sessions = 0
+        self.sessions_without_connection = 0
+
+    def snapshot(self) -> dict:
+        return dict(vars(self))
+
+
+connection_stats = ConnectionStats()
+
+
+def install_idle_pre_ping(engine: Engine, idle_seconds: float) -> None:
+    """
+    Ping pooled connections at checkout only when they sat idle for ``idle_seconds``.
+
+    Replaces ``pool_pre_ping=True``, which pays a ``SELECT 1`` round trip on every
+    checkout. A connection returned moments ago is almost never dead; one idle for
+    a while may have been dropped by the server or a proxy. A failed ping raises
+    DisconnectionError, so the pool discards the connection and retries with a
+    fresh one. ``idle_seconds=0`` pings every checkout; a negative value never pings.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_stats.checkouts += 1
+        CHECKOUTS.inc()
+        idle = time.monotonic() - connection_record.info.get("last_checkin", time.monotonic())
+        if idle_seconds < 0 or idle < idle_seconds:
+            connection_stats.pings_skipped += 1
+            PINGS_SKIPPED.inc()
+            return
+        connection_stats.pings += 1
+        PINGS.inc()
+        try:
+            alive = engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            raise exc.DisconnectionError(f"Connection idle for {idle:.0f}s failed its ping: {e}") from e
+        if alive is False:
+            raise exc.DisconnectionError(f"Connection idle for {idle:.0f}s failed its ping")
+
+
+@event.listens_for(Session, "after_begin")
+def _mark_session_connected(session, transaction, connection):
+    session.info["db_connected"] = True
+
+
+def record_session_usage(session: Session) -> None:
+    """Count a finished request session and whether it ever needed a connection."""
+    connection_stats.sessions += 1
+    SESSIONS.inc()
+    if not session.info.get("db_connected"):
+        connection_stats.sessions_without_connection += 1
+        SESSIONS_WITHOUT_CONNECTION.inc()
@@ -1,9 +1,12 @@
 from datetime import datetime
 from typing import Annotated, Optional
 
-from sqlalchemy import func, text
+from sqlalchemy import Column, Computed, Index, Integer, any_, bindparam, func, insert, literal_column, text, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import joinedload
 from sqlmodel import Field, Relationship, select
 
+from ..config import settings
 from ..models.users import User
 
 from ..schemas.posts import Post, PostOutWithVotes
@@ -13,21 +16,56 @@ from .votes import Votes
 
 class Posts(BaseModel, table=True):
 	__tablename__ = "posts"
+	__table_args__ = (
+		Index("ix_posts_date_id", "date", "id"),  # keyset pagination on (date, id)
+		Index("ix_posts_vote_count_id", "vote_count", "id"),  # keyset pagination on (vote_count, id)
+		{"extend_existing": True},
+	)
 	id: Annotated[int, Field(primary_key=True, index=True, nullable=False)]
 	owner_id: Annotated[int, Field(nullable=False, foreign_key="user.id", ondelete="CASCADE")]
 	title: Annotated[str, Field(nullable=False)]
 	content: Annotated[str, Field(nullable=False)]
 	published: bool = Field(default=True, nullable=False, sa_column_kwargs={"server_default": "true"})
 	date: datetime = Field(default_factory=datetime.utcnow, nullable=False, sa_column_kwargs={"server_default": text("NOW()")})
+	# Denormalized count of votes rows, maintained by the vote helpers in models/votes.py
+	vote_count: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+	# Last edit or vote change; drives the ETag / Last-Modified of post responses
+	updated_at: datetime = Field(default_factory=datetime.utcnow, nullable=False, sa_column_kwargs={"server_default": text("NOW()")})
 	owner: Optional["User"] = Relationship()
 
 
+# Generated full-text document over title + content. It lives on the table only (not the
+# mapper), so it is created with the table but never loaded or serialized with a post.
+posts_search_vector = Column(
+	"search_vector",
+	TSVECTOR,
+	Computed("to_tsvector('english', coalesce(title, '') || ' ' || coalesce(content, ''))", persisted=True),
+)
+Posts.__table__.append_column(posts_search_vector)
+Index("ix_posts_search_vector", posts_search_vector, postgresql_using="gin")
+
+
 
 def get_posts_from_db_by_model(session: SessionDep) -> list[Posts]:
 	"""Fetch all posts from the database."""
 	return session.exec(select(Posts)).all()
 
 
+EXPORT_COLUMNS = ("id", "owner_id", "title", "content", "published", "date", "vote_count", "updated_at")
+
+
+def iter_posts_for_export(session: SessionDep, batch_size: int = 1000):
+	"""Yield every post as lists of row mappings, ``batch_size`` rows at a time.
+
+	``yield_per`` makes psycopg use a server-side cursor, so only one batch is held
+	in memory. Plain columns are selected so rows are not tracked by the session.
+	"""
+	columns = [getattr(Posts, name) for name in EXPORT_COLUMNS]
+	result = session.execute(select(*columns).order_by(Posts.id).execution_options(yield_per=batch_size))
+	for partition in result.mappings().partitions():
+		yield partition
+
+
 def get_posts_response(session: SessionDep) -> list[Post]:
 	"""Fetch all posts and map them to the API response model."""
 	db_posts = get_posts_from_db_by_model(session)
@@ -56,6 +94,20 @@ def create_post_in_db_by_model(post: dict, session: SessionDep) -> Optional[Post
 	return new_post
 
 
+def create_posts_in_db_bulk(posts: list[dict], session: SessionDep, chunk_size: int = 500) -> list[int]:
+	"""Insert many posts in one transaction and return their ids in input order.
+
+	Each chunk is one multi-row ``INSERT ... RETURNING id`` (SQLAlchemy's insertmanyvalues),
+	so the cost is one round trip per ``chunk_size`` posts rather than a commit per post.
+	"""
+	ids = []
+	for start in range(0, len(posts), chunk_size):
+		chunk = posts[start:start + chunk_size]
+		ids.extend(session.scalars(insert(Posts).returning(Posts.id, sort_by_parameter_order=True), chunk).all())
+	session.commit()
+	return ids
+
+
 def delete_post_from_db_by_model(post_id: int, session: SessionDep) -> Optional[Posts]:
 	post_to_delete = session.exec(select(Posts).where(Posts.id == post_id)).first()
 	if post_to_delete:
@@ -72,6 +124,7 @@ def update_post_in_db_by_model(post_id: int, post: dict, session: SessionDep) ->
 		post_to_update.content = post["content"]
 		post_to_update.published = post["published"]
 		post_to_update.owner_id = post["owner_id"]
+		post_to_update.updated_at = datetime.utcnow()
 		session.add(post_to_update)
 		session.commit()
 		session.refresh(post_to_update)
@@ -79,12 +132,97 @@ def update_post_in_db_by_model(post_id: int, post: dict, session: SessionDep) ->
 	return None
 
 
+def get_posts_with_votes(
+	limit: int,
+	skip: int,
+	search: Optional[str],
+	session: SessionDep,
+	sort: str = "date",
+	after: Optional[tuple] = None,
+) -> list[PostOutWithVotes]:
+	"""Fetch a page of posts with their vote counts, filtered by ``search``.
+
+	Posts are ordered newest first (``sort="date"``), most voted first
+	(``sort="votes"``) or by search rank (``sort="relevance"``), ties broken by
+	id. ``after`` is the decoded ``(key, id)`` of the last row of the previous
+	page; when given, the page starts right after it (keyset pagination) and
+	``skip`` is ignored.
+	"""
+	query = (
+		select(Posts, Posts.vote_count.label("votes"))
+		# owner is serialized after the session helper returns; join it in the same statement
+		.options(joinedload(Posts.owner, innerjoin=True))
+	)
+	rank = None
+	if search:
+		query, rank = _apply_search(query, search)
+	if sort == "relevance" and rank is not None:
+		query = query.order_by(rank.desc(), Posts.id.desc())
+	elif sort == "votes":
+		query = query.order_by(Posts.vote_count.desc(), Posts.id.desc())
+		if after is not None:
+			query = query.where(tuple_(Posts.vote_count, Posts.id) < tuple_(*after))
+	else:
+		query = query.order_by(Posts.date.desc(), Posts.id.desc())
+		if after is not None:
+			query = query.where(tuple_(Posts.date, Posts.id) < tuple_(*after))
+	if after is None:
+		query = query.offset(skip)
+	return session.exec(query.limit(limit)).all()
+
+
+def _apply_search(query, search: str):
+	"""Filter ``query`` by ``search`` using POSTS_SEARCH_MODE and return it with a rank expression.
+
+	- ``fulltext``: ``search_vector @@ websearch_to_tsquery`` (GIN index), ranked by ``ts_rank``
+	- ``trigram``: case-insensitive substring match on title (pg_trgm GIN index), ranked by similarity
+	- ``like``: the original case-sensitive ``LIKE '%term%'`` on title, unranked
+	"""
+	mode = settings.posts_search_mode
+	if mode == "fulltext":
+		ts_query = func.websearch_to_tsquery(literal_column("'english'::regconfig"), search)
+		return query.where(posts_search_vector.op("@@")(ts_query)), func.ts_rank(posts_search_vector, ts_query)
+	if mode == "trigram":
+		return query.where(Posts.title.icontains(search, autoescape=True)), func.similarity(Posts.title, search)
+	return query.filter(Posts.title.contains(search)), None
+
+
 def get_post_user_vote(post_id: int, session: SessionDep) -> Optional[PostOutWithVotes]:
 	"""Return the vote of the current user for a specific post."""
 	posts = session.exec(
-		select(Posts, func.count(Votes.post_id).label("votes"))
-		.outerjoin(Votes, Votes.post_id == Posts.id)
+		select(Posts, Posts.vote_count.label("votes"))
 		.where(Posts.id == post_id)
-		.group_by(Posts.id)
+		.options(joinedload(Posts.owner, innerjoin=True))
 	).first()
-	return posts
\ No newline at end of file
+	return posts
+
+
+def get_posts_by_ids(ids: list[int], session: SessionDep) -> list[PostOutWithVotes]:
+	"""Fetch the posts with the given ids, with vote counts and owners, in one statement.
+
+	The ids travel as a single array parameter (``id = ANY(:ids)``), so the statement
+	text is the same for any batch size. Rows come back in no particular order.
+	"""
+	return session.exec(
+		select(Posts, Posts.vote_count.label("votes"))
+		.where(Posts.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+		.options(joinedload(Posts.owner, innerjoin=True))
+	).all()
+
+
+def reconcile_vote_counts(session: SessionDep, dry_run: bool = False) -> int:
+	"""Repair posts whose stored vote_count drifted from the votes table.
+
+	Returns the number of posts that were (or, with ``dry_run``, would be) fixed.
+	"""
+	actual = select(func.count()).where(Votes.post_id == Posts.id).scalar_subquery()
+	if dry_run:
+		return session.exec(select(func.count()).select_from(Posts).where(Posts.vote_count != actual)).one()
+	result = session.execute(
+		update(Posts)
+		.where(Posts.vote_count != actual)
+		.values(vote_count=actual)
+		.execution_options(synchronize_session=False)
+	)
+	session.commit()
+	return result.rowcount
@@ -0,0 +1,120 @@
+import asyncio
+import itertools
+import math
+import time
+from typing import Generic, Optional, Sequence, TypeVar
+
+from sqlalchemy import Engine, text
+
+E = TypeVar("E")
+
+# Cookie holding the epoch time until which a client's reads stay on the primary
+READ_PRIMARY_COOKIE = "db_primary_until"
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything it received
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaRouter(Generic[E]):
+    """
+    Pick the engine a read-only session should use.
+
+    ``engines`` are the replica engines used by sessions (sync or async) and
+    ``probe_engines`` the matching sync engines used to measure replication lag.
+    Replicas whose last measured lag exceeds ``max_lag_seconds`` (or that could
+    not be probed) are skipped; when none is usable, reads go to ``primary``.
+    """
+
+    def __init__(
+        self,
+        primary: E,
+        engines: Sequence[E],
+        probe_engines: Sequence[Engine],
+        strategy: str = "round_robin",
+        max_lag_seconds: float = 10.0,
+    ):
+        self.primary = primary
+        self.engines = list(engines)
+        self.probe_engines = list(probe_engines)
+        self.strategy = strategy
+        self.max_lag_seconds = max_lag_seconds
+        # Unknown lag counts as healthy until the first probe says otherwise
+        self.lag: list[float] = [0.0] * len(self.engines)
+        self.primary_fallbacks = 0
+        self._counter = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def pick(self, sticky: bool = False) -> E:
+        """Return a replica engine, or the primary if ``sticky`` or no replica is fresh enough."""
+        if sticky or not self.engines:
+            return self.primary
+        healthy = [i for i, lag in enumerate(self.lag) if lag <= self.max_lag_seconds]
+        if not healthy:
+            self.primary_fallbacks += 1
+            return self.primary
+        if self.strategy == "least_loaded":
+            index = min(healthy, key=lambda i: _checked_out(self.engines[i]))
+        else:
+            index = healthy[next(self._counter) % len(healthy)]
+        return self.engines[index]
+
+    def refresh_lag(self) -> list[float]:
+        """Measure every replica's lag (blocking); unreachable replicas get ``inf``."""
+        for i, probe in enumerate(self.probe_engines):
+            try:
+                with probe.connect() as conn:
+                    self.lag[i] = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+            except Exception as e:
+                if not math.isinf(self.lag[i]):
+                    print(f"Replica {i} lag probe failed, routing reads elsewhere: {e}")
+                self.lag[i] = math.inf
+        return self.lag
+
+    async def monitor(self, interval_seconds: float):
+        """Refresh replica lag every ``interval_seconds`` until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await loop.run_in_executor(None, self.refresh_lag)
+            await asyncio.sleep(interval_seconds)
+
+    def stats(self) -> dict:
+        return {"lag_seconds": list(self.lag), "primary_fallbacks": self.primary_fallbacks}
+
+
+def _checked_out(engine) -> int:
+    pool = getattr(engine, "pool", None)
+    checkedout = getattr(pool, "checkedout", None)
+    return checkedout() if checkedout else 0
+
+
+def read_only_route(endpoint):
+    """Mark a non-GET endpoint as read-only so it does not pin the client to the primary."""
+    endpoint.read_only = True
+    return endpoint
+
+
+def is_write_request(request) -> bool:
+    """True for a request that may have written: not GET/HEAD/OPTIONS and not a read_only_route."""
+    if request.method in ("GET", "HEAD", "OPTIONS"):
+        return False
+    endpoint = getattr(request.scope.get("route"), "endpoint", None)
+    return not getattr(endpoint, "read_only", False)
+
+
+def is_sticky_request(request) -> bool:
+    """True while this client's reads stay on the primary; such reads must also bypass response caches."""
+    return is_sticky(request.cookies.get(READ_PRIMARY_COOKIE))
+
+
+def is_sticky(cookie: Optional[str]) -> bool:
+    """True while the read-your-writes cookie set after a write has not expired."""
+    try:
+        return float(cookie) > time.time()
+    except (TypeError, ValueError):
+        return False
@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import Annotated, Optional
+
+from sqlmodel import Field, delete, select, update
+
+from .db_orm import BaseModel, SessionDep
+
+
+class RefreshToken(BaseModel, table=True):
+    """A refresh token handed out at login; rotated (revoked and replaced) on every use."""
+    __tablename__ = "refresh_token"
+    jti: Annotated[str, Field(primary_key=True)]
+    user_id: Annotated[int, Field(foreign_key="user.id", ondelete="CASCADE", nullable=False, index=True)]
+    expires_at: Annotated[datetime, Field(nullable=False)]
+    revoked_at: Optional[datetime] = Field(default=None, nullable=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+
+
+class RevokedToken(BaseModel, table=True):
+    """An access token revoked before its expiry (logout); rows are useless once ``expires_at`` passes."""
+    __tablename__ = "revoked_token"
+    jti: Annotated[str, Field(primary_key=True)]
+    expires_at: Annotated[datetime, Field(nullable=False, index=True)]
+
+
+def create_refresh_token_db(jti: str, user_id: int, expires_at: datetime, session: SessionDep) -> RefreshToken:
+    """Store a newly issued refresh token."""
+    token = RefreshToken(jti=jti, user_id=user_id, expires_at=expires_at)
+    session.add(token)
+    session.commit()
+    return token
+
+
+def use_refresh_token_db(jti: str, session: SessionDep) -> tuple[str, Optional[int]]:
+    """
+    Revoke a refresh token as it is exchanged and report what happened.
+
+    Returns ``("ok", user_id)``, ``("invalid", None)`` for an unknown or expired token,
+    or ``("reused", user_id)`` when the token was already used - a sign it was
+    stolen, so every refresh token of that user is revoked.
+    """
+    now = datetime.utcnow()
+    # Revoke first; only one of two racing requests can win the update
+    user_id = session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.jti == jti, RefreshToken.revoked_at.is_(None), RefreshToken.expires_at > now)
+        .values(revoked_at=now)
+        .returning(RefreshToken.user_id)
+    ).scalar_one_or_none()
+    if user_id is not None:
+        session.commit()
+        return "ok", user_id
+    token = session.exec(select(RefreshToken).where(RefreshToken.jti == jti)).first()
+    if token is None or token.revoked_at is None:
+        return "invalid", None
+    revoke_user_refresh_tokens_db(token.user_id, session=session)
+    return "reused", token.user_id
+
+
+def revoke_refresh_token_db(jti: str, session: SessionDep) -> None:
+    """Revoke a single refresh token (logout)."""
+    session.exec(
+        update(RefreshToken).where(RefreshToken.jti == jti, RefreshToken.revoked_at.is_(None)).values(revoked_at=datetime.utcnow())
+    )
+    session.commit()
+
+
+def revoke_user_refresh_tokens_db(user_id: int, session: SessionDep) -> None:
+    """Revoke every outstanding refresh token of a user."""
+    session.exec(
+        update(RefreshToken).where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None)).values(revoked_at=datetime.utcnow())
+    )
+    session.commit()
+
+
+def revoke_access_token_db(jti: str, expires_at: datetime, session: SessionDep) -> None:
+    """
+    Record a revoked access token until it would have expired anyway.
+
+    Rows that have expired are pruned in the same transaction, so the table only
+    grows with logouts and the workers' periodic sync stays read-only.
+    """
+    session.exec(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+    if session.get(RevokedToken, jti) is None:
+        session.add(RevokedToken(jti=jti, expires_at=expires_at))
+    session.commit()
+
+
+def get_revoked_tokens_db(session: SessionDep) -> list[tuple[str, datetime]]:
+    """Return the unexpired revoked access tokens."""
+    return [
+        tuple(row) for row in session.exec(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > datetime.utcnow())
+        )
+    ]
@@ -2,13 +2,18 @@ from datetime import datetime
 from typing import Annotated, Optional
 
 from pydantic import EmailStr
+from app.config import settings
 from app.models.db_orm import SessionDep
 from sqlmodel import Field, SQLModel, SQLModel, select, text
 from argon2 import PasswordHasher   
 
 
 # Create a PasswordHasher instance
-ph = PasswordHasher()
+ph = PasswordHasher(
+    time_cost=settings.argon2_time_cost,
+    memory_cost=settings.argon2_memory_cost,
+    parallelism=settings.argon2_parallelism,
+)
 
 class BaseModel(SQLModel):
     """Base model class with global table configuration"""
@@ -32,6 +37,10 @@ def verify_password(hashed_password: str, plain_password: str) -> bool:
     """Verify a plain text password against the hashed version"""
     return ph.verify(hashed_password, plain_password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a hash was made with different parameters than the current hasher"""
+    return ph.check_needs_rehash(hashed_password)
+
 
 def get_user_by_id(user_id: int, session: SessionDep) -> Optional[User]:
     """Fetch a user by ID from the database."""
@@ -47,9 +56,23 @@ def get_user_by_email_db(email: str, session: SessionDep) -> Optional[User]:
     return session.exec(select(User).where(User.email == email)).first()
 
 
+def update_user_password_hash_db(user_id: int, password_hash: str, session: SessionDep) -> Optional[User]:
+    """Replace the stored password hash of a user."""
+    user = session.exec(select(User).where(User.id == user_id)).first()
+    if not user:
+        return None
+    user.password_hash = password_hash
+    session.add(user)
+    session.commit()
+    return user
+
+
 def create_new_user_db(user: dict, session: SessionDep) -> Optional[User]:
-    """Create a new user in the database."""
-    hashed_pwd = hash_password(user["password"])
+    """Create a new user in the database.
+
+    A precomputed ``password_hash`` (e.g. from the hashing pool) is used as-is.
+    """
+    hashed_pwd = user.get("password_hash") or hash_password(user["password"])
     user["password_hash"] = hashed_pwd
     new_user = User(**user)
     session.add(new_user)
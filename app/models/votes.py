@@ -1,12 +1,17 @@
 from datetime import datetime
 from typing import Annotated, Optional
 
-from sqlalchemy import text
+from sqlalchemy import bindparam, column, delete, table, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import Field, select
 
 from .db_orm import BaseModel, SessionDep
 
 
+# Lightweight handle on posts.vote_count (models/posts.py imports this module)
+_posts_table = table("posts", column("id"), column("vote_count"), column("updated_at"))
+
+
 class Votes(BaseModel, table=True):
     __tablename__ = "votes"
     post_id: Annotated[int, Field(nullable=False, foreign_key="posts.id", ondelete="CASCADE", primary_key=True)]
@@ -14,24 +19,132 @@ class Votes(BaseModel, table=True):
     date: datetime = Field(default_factory=datetime.utcnow, nullable=False, sa_column_kwargs={"server_default": text("NOW()")})
 
 
-def create_vote_in_db_by_model(vote: dict, session: SessionDep) -> Optional[Votes]:
-    """Create a new vote in the database."""
-    new_vote = Votes(**vote)
-    session.add(new_vote)
-    session.commit()
-    session.refresh(new_vote)
-    return new_vote
-
-
-def delete_vote_in_db_by_model(vote: dict, session: SessionDep) -> Optional[Votes]:
-    """Delete a vote from the database."""
-    vote_tbd = session.exec(
+def get_vote_from_db_by_model(post_id: int, user_id: int, session: SessionDep) -> Optional[Votes]:
+    """Fetch the vote a user cast on a post, if any."""
+    return session.exec(
         select(Votes).where(
-            (Votes.post_id == vote["post_id"]) & (Votes.user_id == vote["user_id"])
+            (Votes.post_id == post_id) & (Votes.user_id == user_id)
         )
     ).first()
-    if not vote_tbd:
+
+
+def create_vote_in_db_by_model(vote: dict, session: SessionDep) -> Optional[dict]:
+    """Create a new vote in the database.
+
+    Returns None when the user already voted on the post, including when a
+    concurrent request inserted the same vote first (``ON CONFLICT DO NOTHING``).
+    """
+    created = session.execute(
+        pg_insert(Votes).values(post_id=vote["post_id"], user_id=vote["user_id"]).on_conflict_do_nothing()
+        .returning(Votes.post_id, Votes.user_id, Votes.date)
+    ).mappings().first()
+    if created is None:
+        session.rollback()
+        return None
+    created = dict(created)
+    _adjust_vote_count(vote["post_id"], 1, session)
+    session.commit()
+    return created
+
+
+def delete_vote_in_db_by_model(vote: dict, session: SessionDep) -> Optional[dict]:
+    """Delete a vote from the database.
+
+    The count is only decremented when this DELETE removed the row, so two
+    concurrent removals of the same vote cannot decrement it twice.
+    """
+    deleted = session.execute(
+        delete(Votes)
+        .where((Votes.post_id == vote["post_id"]) & (Votes.user_id == vote["user_id"]))
+        .returning(Votes.post_id, Votes.user_id, Votes.date)
+        .execution_options(synchronize_session=False)
+    ).mappings().first()
+    if deleted is None:
+        session.rollback()
         return None
-    session.delete(vote_tbd)
+    deleted = dict(deleted)
+    _adjust_vote_count(vote["post_id"], -1, session)
     session.commit()
-    return vote_tbd
\ No newline at end of file
+    return deleted
+
+
+def _adjust_vote_count(post_id: int, delta: int, session: SessionDep) -> None:
+    """Shift posts.vote_count (and bump updated_at) in the same transaction as the vote change."""
+    session.execute(
+        update(_posts_table)
+        .where(_posts_table.c.id == post_id)
+        .values(vote_count=_posts_table.c.vote_count + delta, updated_at=datetime.utcnow())
+    )
+
+
+def apply_vote_batch(ops: list[tuple[int, int, int]], session: SessionDep) -> list[tuple[str, Optional[dict]]]:
+    """
+    Apply many ``(post_id, user_id, direction)`` vote changes in one transaction.
+
+    Each ``(post_id, user_id)`` pair must appear at most once. Votes are added with a
+    single multi-row ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` and removed with a
+    single ``DELETE ... RETURNING``; vote counts are adjusted per post in one batch.
+
+    Returns one ``(outcome, row)`` per op, in order, where outcome is ``"created"``,
+    ``"conflict"``, ``"post_not_found"``, ``"deleted"`` or ``"not_found"``.
+    """
+    post_ids = {post_id for post_id, _, _ in ops}
+    # Key-share lock keeps the posts from being deleted until the inserts commit.
+    # Posts are locked and updated, and votes written, in key order, so batches
+    # flushed concurrently by different workers do not deadlock on hot posts.
+    existing_posts = set(session.execute(
+        select(_posts_table.c.id).where(_posts_table.c.id.in_(post_ids))
+        .order_by(_posts_table.c.id).with_for_update(key_share=True)
+    ).scalars())
+
+    to_insert = [
+        {"post_id": post_id, "user_id": user_id}
+        for post_id, user_id, direction in sorted(ops)
+        if direction == 1 and post_id in existing_posts
+    ]
+    to_delete = sorted((post_id, user_id) for post_id, user_id, direction in ops if direction == 0)
+
+    created = {}
+    if to_insert:
+        rows = session.execute(
+            pg_insert(Votes).values(to_insert).on_conflict_do_nothing()
+            .returning(Votes.post_id, Votes.user_id, Votes.date)
+        ).mappings()
+        created = {(row["post_id"], row["user_id"]): dict(row) for row in rows}
+    deleted = {}
+    if to_delete:
+        rows = session.execute(
+            delete(Votes).where(tuple_(Votes.post_id, Votes.user_id).in_(to_delete))
+            .returning(Votes.post_id, Votes.user_id, Votes.date)
+            .execution_options(synchronize_session=False)
+        ).mappings()
+        deleted = {(row["post_id"], row["user_id"]): dict(row) for row in rows}
+
+    deltas: dict[int, int] = {}
+    for post_id, _ in created:
+        deltas[post_id] = deltas.get(post_id, 0) + 1
+    for post_id, _ in deleted:
+        deltas[post_id] = deltas.get(post_id, 0) - 1
+    deltas = {post_id: delta for post_id, delta in deltas.items() if delta}
+    if deltas:
+        session.execute(
+            update(_posts_table)
+            .where(_posts_table.c.id == bindparam("post_id"))
+            .values(vote_count=_posts_table.c.vote_count + bindparam("delta"), updated_at=datetime.utcnow()),
+            [{"post_id": post_id, "delta": delta} for post_id, delta in sorted(deltas.items())],
+        )
+    session.commit()
+
+    results = []
+    for post_id, user_id, direction in ops:
+        key = (post_id, user_id)
+        if direction == 1:
+            if key in created:
+                results.append(("created", created[key]))
+            elif post_id not in existing_posts:
+                results.append(("post_not_found", None))
+            else:
+                results.append(("conflict", None))
+        else:
+            results.append(("deleted", deleted[key]) if key in deleted else ("not_found", None))
+    return results
@@ -1,33 +1,96 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Response
 from fastapi.security import OAuth2PasswordRequestForm
 
 from .. import models, schemas, utils
-from ..models.db_orm import SessionDep, get_session, Session
+from ..config import settings
+from ..models.db_orm import Session, get_db_session, run_db
 from ..models import *
 from ..utils.auth import *
-from ..schemas.users import LoginResponse
+from ..models.tokens import create_refresh_token_db, revoke_access_token_db, revoke_refresh_token_db, use_refresh_token_db
+from ..schemas.users import LoginResponse, RefreshRequest
+from ..utils.hashing import hashing_pool
+from ..utils.revocation import revocation_list
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/login", response_model=LoginResponse)
-async def login(user_credentials: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)): # type: ignore
+async def login(user_credentials: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_db_session)): # type: ignore
     """Authenticate a user and return a PASETO token."""
 
-    user = models.get_user_by_email_db(user_credentials.username, session)
+    user = await run_db(session, models.get_user_by_email_db, user_credentials.username)
     if not user:
         raise utils.AppException(status_code=401, detail="Invalid email or password")
-    if not models.users.verify_password(user.password_hash, user_credentials.password):
+    if not await hashing_pool.run(models.users.verify_password, user.password_hash, user_credentials.password):
         raise utils.AppException(status_code=401, detail="Invalid email or password")
     
-    # Create PASETO token
-    token = create_paseto_token(
-        username=user.username,
-        expires_in_minutes=60
-    )
+    # Upgrade hashes made with older Argon2 parameters while we have the plain password
+    if models.users.password_needs_rehash(user.password_hash):
+        new_hash = await hashing_pool.run(models.users.hash_password, user_credentials.password)
+        await run_db(session, models.users.update_user_password_hash_db, user.id, new_hash)
+        utils.token_cache.invalidate_user(user.id)
     
+    return await _login_response(session, user)
+
+
+@router.post("/refresh", response_model=LoginResponse)
+async def refresh(body: RefreshRequest, session: Session = Depends(get_db_session)):
+    """Exchange a refresh token for a new access token and a new refresh token.
+
+    Each refresh token works once. Presenting one that was already used revokes
+    every refresh token of its user, since it was probably stolen.
+    """
+    try:
+        claims = verify_refresh_token(body.refresh_token)
+    except ValueError:
+        raise utils.AppException(status_code=401, detail="Invalid refresh token")
+    outcome, user_id = await run_db(session, use_refresh_token_db, claims["jti"])
+    if outcome != "ok":
+        raise utils.AppException(status_code=401, detail="Invalid refresh token")
+    user = await run_db(session, models.get_user_by_id, user_id)
+    if not user:
+        raise utils.AppException(status_code=401, detail="Invalid refresh token")
+    return await _login_response(session, user)
+
+
+@router.post("/logout", status_code=204)
+async def logout(
+    body: Optional[RefreshRequest] = None,
+    token: str = Depends(oauth2_scheme),
+    claims: dict = Depends(get_access_claims),
+    session: Session = Depends(get_db_session),
+):
+    """Revoke the access token of the request and, when given, a refresh token.
+
+    Other workers stop accepting the access token within TOKEN_REVOCATION_SYNC_SECONDS.
+    """
+    if claims.get("jti"):
+        expires_at = claim_datetime(claims["exp"])
+        await run_db(session, revoke_access_token_db, claims["jti"], expires_at)
+        revocation_list.add(claims["jti"], expires_at)
+    utils.token_cache.invalidate_token(token)
+    if body is not None:
+        try:
+            refresh_claims = verify_refresh_token(body.refresh_token)
+        except ValueError:
+            raise utils.AppException(status_code=401, detail="Invalid refresh token")
+        await run_db(session, revoke_refresh_token_db, refresh_claims["jti"])
+    return Response(status_code=204)
+
+
+async def _login_response(session: Session, user: models.users.User) -> LoginResponse:
+    """Issue an access token, plus a stored refresh token for claims-format tokens."""
+    token = create_access_token(user)
+    if settings.access_token_format != "claims":
+        return LoginResponse(access_token=token, token_type="Bearer", username=user.username)
+    refresh_token, jti, expires_at = create_refresh_token(user.id)
+    await run_db(session, create_refresh_token_db, jti, user.id, expires_at)
     return LoginResponse(
         access_token=token,
         token_type="Bearer",
-        username=user.username
-    )  
\ No newline at end of file
+        username=user.username,
+        refresh_token=refresh_token,
+        expires_in=settings.claims_access_token_minutes * 60,
+    )
@@ -1,75 +1,309 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, Response
-from sqlalchemy import func
-from sqlmodel import Session, select
-
-
-from ..models.votes import Votes
+import json
+from typing import List, Literal
 
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 
 
+from ..config import settings
 from ..models.users import User
-from ..utils.auth import get_current_user, get_session
-from ..models.db_orm import SessionDep, get_session
+from ..utils.auth import CurrentPrincipal
+from ..utils.cache import post_cache
+from ..utils.conditional import http_date, is_not_modified, not_modified_response, post_rows_etag
+from ..models.db_orm import ReadDBSessionDep, Session, get_db_read_session, get_db_session, run_db
+from ..models.replicas import is_sticky_request, read_only_route
 from ..models.posts import *
 from ..schemas.posts import *
 from ..schemas.users import User as UserSchema
+from ..utils.export import EXPORT_MEDIA_TYPES, stream_posts_export
 from ..utils.helpers import AppException
+from ..utils.pagination import decode_cursor, encode_cursor
 from ..models.posts import Posts
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
+_post_list_adapter = TypeAdapter(List[PostOutWithVotes])
+_post_adapter = TypeAdapter(PostOutWithVotes)
+_post_batch_adapter = TypeAdapter(PostBatchOut)
+_post_create_adapter = TypeAdapter(PostCreate)
+
+
+def _dump_json(adapter: TypeAdapter, rows) -> bytes:
+	"""Validate ORM rows once and encode them to JSON bytes in pydantic-core."""
+	return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
 
 @router.get("/", response_model=List[PostOutWithVotes])
-async def get_posts(session: SessionDep, limit: int = 10, skip: int = 0, search: Optional[str] = "") -> List[PostOutWithVotes]:
-	"""Retrieve list of all posts stored in posts table."""
-	posts = session.exec(
-		select(Posts, func.count(Votes.post_id).label("votes"))
-		.outerjoin(Votes, Votes.post_id == Posts.id)
-		.group_by(Posts.id)
-		.filter(Posts.title.contains(search)).limit(limit).offset(skip)
-	).all()
+async def get_posts(
+	request: Request,
+	response: Response,
+	session: ReadDBSessionDep,
+	limit: int = 10,
+	skip: int = 0,
+	search: Optional[str] = "",
+	sort: Optional[Literal["date", "votes", "relevance"]] = None,
+	cursor: Optional[str] = None,
+) -> List[PostOutWithVotes]:
+	"""Retrieve list of all posts stored in posts table.
+
+	Results are ranked by relevance when ``search`` is given and newest first
+	otherwise, unless ``sort`` says otherwise. Pass the ``X-Next-Cursor`` header
+	of a response back as ``cursor`` to fetch the next page; ``skip`` still works
+	for offset paging and is the only option for relevance order. Responses carry
+	an ETag and honour ``If-None-Match``.
+	"""
+	if sort is None:
+		sort = "relevance" if search else "date"
+	# Clients reading their own writes from the primary bypass the cache, which a
+	# replica read may have refilled with the pre-write body
+	use_cache = post_cache.enabled and not is_sticky_request(request)
+	cache_key = post_cache.key("list", limit, skip, search, sort, cursor)
+	cached = await post_cache.get_response(cache_key) if use_cache else None
+	if cached:
+		if is_not_modified(request, cached.headers.get("etag")):
+			return not_modified_response(cached.headers)
+		return cached
+	
+	# Taken before the read so a write landing in between is not cached over
+	cache_version = await post_cache.version() if use_cache else None
+	after = decode_cursor(cursor, sort)
+	posts = await run_db(session, get_posts_with_votes, limit, skip, search, sort=sort, after=after)
+	headers = {}
+	if posts and len(posts) == limit and sort != "relevance":
+		last = posts[-1]
+		key = last.votes if sort == "votes" else last.Posts.date
+		headers["X-Next-Cursor"] = encode_cursor(sort, key, last.Posts.id)
+	headers["ETag"] = post_rows_etag(posts, headers.get("X-Next-Cursor"))
+	# Answer 304 before any serialization work
+	if is_not_modified(request, headers["ETag"]):
+		return not_modified_response(headers)
+	
+	if not use_cache and settings.fast_json_responses:
+		return Response(content=_dump_json(_post_list_adapter, posts), media_type="application/json", headers=headers)
+	if use_cache:
+		body = _dump_json(_post_list_adapter, posts)
+		# A list goes stale when any post on it changes, when posts are added or removed,
+		# and - for vote-ordered and searched lists - when votes or post text change
+		tags = ["list", f"list:{sort}", *(["list:search"] if search else []), *(f"post:{row.Posts.id}" for row in posts)]
+		await post_cache.store(cache_key, body, tags, headers, since=cache_version)
+		return Response(content=body, media_type="application/json", headers={**headers, "X-Cache": "MISS"})
+	response.headers.update(headers)
 	return posts
 
+@router.get("/export")
+async def export_posts(current_user: CurrentPrincipal, format: Literal["ndjson", "csv"] = "ndjson"):
+	"""Stream every post as NDJSON (one object per line) or CSV.
+
+	Rows are read through a server-side cursor in batches of POSTS_EXPORT_BATCH_SIZE
+	and written as they arrive, so memory use does not grow with the table.
+	"""
+	return StreamingResponse(
+		stream_posts_export(format),
+		media_type=EXPORT_MEDIA_TYPES[format],
+		headers={"Content-Disposition": f'attachment; filename="posts.{format}"'},
+	)
+
+
+@router.get("/batch", response_model=PostBatchOut)
+async def get_posts_batch(
+	session: ReadDBSessionDep,
+	ids: str = Query(..., description="Comma-separated post ids, e.g. 3,1,2"),
+):
+	"""Fetch many posts by id in one query.
+
+	Posts come back in the requested order (duplicates once); ids that do not
+	exist are listed in ``missing``. Use the POST variant for long lists.
+	"""
+	parts = ids.strip(", ").split(",", settings.posts_batch_max_ids)
+	if len(parts) > settings.posts_batch_max_ids:
+		raise AppException(status_code=400, detail=f"At most {settings.posts_batch_max_ids} ids per batch")
+	try:
+		post_ids = [int(part) for part in parts if part.strip()]
+	except ValueError:
+		raise AppException(status_code=400, detail="ids must be comma-separated integers")
+	return await _batch_response(session, post_ids)
+
+
+@router.post("/batch", response_model=PostBatchOut)
+@read_only_route
+async def get_posts_batch_post(batch: PostBatchRequest, session: Session = Depends(get_db_read_session)):
+	"""Same as ``GET /posts/batch`` with the ids in a JSON body: ``{"ids": [3, 1, 2]}``."""
+	return await _batch_response(session, batch.ids)
+
+
+async def _batch_response(session, post_ids: List[int]):
+	post_ids = list(dict.fromkeys(post_ids))
+	if not post_ids:
+		raise AppException(status_code=400, detail="No post ids given")
+	if len(post_ids) > settings.posts_batch_max_ids:
+		raise AppException(status_code=400, detail=f"At most {settings.posts_batch_max_ids} ids per batch")
+	rows = await run_db(session, get_posts_by_ids, post_ids)
+	by_id = {row.Posts.id: row for row in rows}
+	batch = {
+		"posts": [by_id[post_id] for post_id in post_ids if post_id in by_id],
+		"missing": [post_id for post_id in post_ids if post_id not in by_id],
+	}
+	if settings.fast_json_responses:
+		return Response(content=_dump_json(_post_batch_adapter, batch), media_type="application/json")
+	return batch
+
+
 @router.get("/{post_id}", response_model=PostOutWithVotes)
-async def get_post(post_id: int, session: SessionDep):
-	"""Fetch a single post by its integer ID."""
-	post = get_post_user_vote(post_id, session)
-	if post:
-		return post
-	raise AppException(status_code=404, detail="Post not found")
+async def get_post(post_id: int, request: Request, response: Response, session: ReadDBSessionDep):
+	"""Fetch a single post by its integer ID.
+
+	Responses carry ETag / Last-Modified and honour ``If-None-Match`` and
+	``If-Modified-Since``.
+	"""
+	use_cache = post_cache.enabled and not is_sticky_request(request)
+	cache_key = post_cache.key("detail", post_id)
+	cached = await post_cache.get_response(cache_key) if use_cache else None
+	if cached:
+		if is_not_modified(request, cached.headers.get("etag"), cached.headers.get("last-modified")):
+			return not_modified_response(cached.headers)
+		return cached
+	
+	cache_version = await post_cache.version() if use_cache else None
+	post = await run_db(session, get_post_user_vote, post_id)
+	if not post:
+		raise AppException(status_code=404, detail="Post not found")
+	headers = {"ETag": post_rows_etag([post]), "Last-Modified": http_date(post.Posts.updated_at)}
+	if is_not_modified(request, headers["ETag"], headers["Last-Modified"]):
+		return not_modified_response(headers)
+	
+	if not use_cache and settings.fast_json_responses:
+		return Response(content=_dump_json(_post_adapter, post), media_type="application/json", headers=headers)
+	if use_cache:
+		body = _dump_json(_post_adapter, post)
+		await post_cache.store(cache_key, body, [f"post:{post_id}"], headers, since=cache_version)
+		return Response(content=body, media_type="application/json", headers={**headers, "X-Cache": "MISS"})
+	response.headers.update(headers)
+	return post
 
 
 @router.post("/", status_code=201, response_model=PostCreate)
-async def create_post(post: PostCreate, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)) -> PostCreate:
+async def create_post(post: PostCreate, current_user: CurrentPrincipal, session: Session = Depends(get_db_session)) -> PostCreate:
 	"""Create a new post entry."""
 	post_dict = {"owner_id": current_user.id, **post.dict()}
-	new_post = create_post_in_db_by_model(post_dict, session)
+	new_post = await run_db(session, create_post_in_db_by_model, post_dict)
 	if new_post:
+		await post_cache.invalidate("list")
 		return new_post
 	raise AppException(status_code=404, detail="Post not found")
 
 
+@router.post("/bulk", status_code=201, response_model=PostBulkOut)
+async def create_posts_bulk(request: Request, current_user: CurrentPrincipal, session: Session = Depends(get_db_session)):
+	"""Create many posts in one transaction.
+
+	The body is a JSON array of post objects, or NDJSON (one object per line) with
+	``Content-Type: application/x-ndjson``. Valid items are inserted in chunks of
+	POSTS_BULK_CHUNK_SIZE; invalid ones are skipped and reported by their index.
+	"""
+	items = await _read_bulk_items(request)
+	if len(items) > settings.posts_bulk_max_items:
+		raise _too_many_bulk_items()
+	valid, indexes, errors = [], [], []
+	for index, item in enumerate(items):
+		if isinstance(item, PostBulkError):
+			errors.append(item)
+			continue
+		try:
+			post = _post_create_adapter.validate_python(item)
+		except ValidationError as e:
+			errors.append(PostBulkError(index=index, detail=_validation_detail(e)))
+			continue
+		valid.append({"owner_id": current_user.id, **post.model_dump()})
+		indexes.append(index)
+	ids = await run_db(session, create_posts_in_db_bulk, valid, chunk_size=settings.posts_bulk_chunk_size) if valid else []
+	if ids:
+		await post_cache.invalidate("list")
+	return PostBulkOut(
+		created=[PostBulkCreated(index=index, id=post_id) for index, post_id in zip(indexes, ids)],
+		errors=errors,
+	)
+
+
+async def _read_bulk_items(request: Request) -> list:
+	"""Parse a bulk body into items; an NDJSON line that is not JSON becomes a PostBulkError.
+
+	Both limits apply while the body is read: POSTS_BULK_MAX_BYTES to the raw
+	body, and POSTS_BULK_MAX_ITEMS to NDJSON lines as they are parsed.
+	"""
+	if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+		items, pending = [], b""
+		async for chunk in _bulk_body_chunks(request):
+			pending += chunk
+			*lines, pending = pending.split(b"\n")
+			items.extend(_parse_ndjson_line(line, len(items)) for line in lines if line.strip())
+			if len(items) > settings.posts_bulk_max_items:
+				raise _too_many_bulk_items()
+		if pending.strip():
+			items.append(_parse_ndjson_line(pending, len(items)))
+		return items
+	body = b"".join([chunk async for chunk in _bulk_body_chunks(request)])
+	try:
+		items = json.loads(body)
+	except ValueError:
+		raise AppException(status_code=400, detail="Body must be a JSON array or NDJSON")
+	if not isinstance(items, list):
+		raise AppException(status_code=400, detail="Body must be a JSON array or NDJSON")
+	return items
+
+
+async def _bulk_body_chunks(request: Request):
+	"""Stream the request body, rejecting it once it exceeds POSTS_BULK_MAX_BYTES."""
+	limit = settings.posts_bulk_max_bytes
+	too_large = AppException(status_code=413, detail=f"Bulk body larger than {limit} bytes")
+	try:
+		declared = int(request.headers.get("content-length", 0))
+	except ValueError:
+		declared = 0
+	if declared > limit:
+		raise too_large
+	received = 0
+	async for chunk in request.stream():
+		received += len(chunk)
+		if received > limit:
+			raise too_large
+		yield chunk
+
+
+def _too_many_bulk_items() -> AppException:
+	return AppException(status_code=400, detail=f"At most {settings.posts_bulk_max_items} posts per request")
+
+
+def _parse_ndjson_line(line: bytes, index: int):
+	try:
+		return json.loads(line)
+	except ValueError:
+		return PostBulkError(index=index, detail="Invalid JSON")
+
+
+def _validation_detail(error: ValidationError) -> str:
+	return "; ".join(f"{'.'.join(str(part) for part in err['loc']) or 'item'}: {err['msg']}" for err in error.errors())
+
+
 @router.delete("/{post_id}", status_code=204)
-async def delete_post(post_id: int, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)):
+async def delete_post(post_id: int, current_user: CurrentPrincipal, session: Session = Depends(get_db_session)):
 	"""Remove a post by ID."""
-	tbd_post = get_post_from_db_by_model_by_id(post_id, session)
+	tbd_post = await run_db(session, get_post_from_db_by_model_by_id, post_id)
 	if not tbd_post:
 		raise AppException(status_code=404, detail="Post not found")
 	if tbd_post.owner_id != current_user.id:
 		raise AppException(status_code=403, detail="Not authorized to delete this post")
-	deleted_post = delete_post_from_db_by_model(post_id, session)
+	deleted_post = await run_db(session, delete_post_from_db_by_model, post_id)
 	if deleted_post:
+		await post_cache.invalidate(f"post:{post_id}", "list")
 		return Response(status_code=204)
 	raise AppException(status_code=404, detail="Post not found")
 
 
 @router.put("/{post_id}", response_model=PostCreate)
-async def update_post(post_id: int, post: PostUpdate, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)) -> Post:
+async def update_post(post_id: int, post: PostUpdate, current_user: CurrentPrincipal, session: Session = Depends(get_db_session)) -> Post:
 	"""Update an existing post by ID."""
-	print("Updating post with ID:", post_id)
-	tbu_post = get_post_from_db_by_model_by_id(post_id, session)
+	tbu_post = await run_db(session, get_post_from_db_by_model_by_id, post_id)
 	
 	if not tbu_post:
 		raise AppException(status_code=404, detail="Post not found")
@@ -77,7 +311,8 @@ async def update_post(post_id: int, post: PostUpdate, current_user: User = Depen
 		raise AppException(status_code=403, detail="Not authorized to update this post")
 	post_dict = {"owner_id": current_user.id, **post.dict()}
 	
-	updated = update_post_in_db_by_model(post_id, post_dict, session)
+	updated = await run_db(session, update_post_in_db_by_model, post_id, post_dict)
 	if updated:
+		await post_cache.invalidate(f"post:{post_id}", "list:search")
 		return updated
 	raise AppException(status_code=404, detail="Post not found")
@@ -1,42 +1,59 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response
+from pydantic import TypeAdapter
 
-from ..models.db_orm import SessionDep, get_session
-from ..schemas.users import User
-from ..utils.auth import get_current_user
+from ..models.db_orm import Session, get_db_read_session, get_db_session, run_db
+from ..models.replicas import is_sticky_request
+from ..utils.auth import CurrentPrincipal
 from ..models import create_new_user_db, get_user_by_id, get_user_by_username_db
+from ..models.users import hash_password
 from ..schemas import users
+from ..utils.cache import user_cache
+from ..utils.hashing import hashing_pool
 from ..utils.helpers import AppException
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+_user_adapter = TypeAdapter(users.User)
+
 
 @router.post("/", status_code=201, response_model=users.UserCreateResponse)
-async def create_user(user: users.UserCreate, session: Session = Depends(get_session)) -> users.UserCreateResponse:
+async def create_user(user: users.UserCreate, session: Session = Depends(get_db_session)) -> users.UserCreateResponse:
 	"""Create a new user entry."""
 	user_dict = user.dict()
-	new_user = create_new_user_db(user_dict, session)
+	user_dict["password_hash"] = await hashing_pool.run(hash_password, user_dict["password"])
+	new_user = await run_db(session, create_new_user_db, user_dict)
 	if new_user:
 		return new_user
 	raise AppException(status_code=404, detail="User not found")
 
 
 @router.get("/{user_id}", response_model=users.User)
-async def get_user(user_id: int, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)) -> users.User:
+async def get_user(user_id: int, request: Request, current_user: CurrentPrincipal, session: Session = Depends(get_db_read_session)) -> users.User:
 	"""Fetch a single user by its integer ID."""
-	user = get_user_by_id(user_id, session)
-	if user:
-		return user
-	raise AppException(status_code=404, detail="User not found")
+	return await _cached_user(request, user_cache.key("detail", user_id), session, get_user_by_id, user_id)
 
 
 @router.get("/{username}", response_model=users.User)
-async def get_user_by_username(username: str, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)) -> users.User:
+async def get_user_by_username(username: str, request: Request, current_user: CurrentPrincipal, session: Session = Depends(get_db_read_session)) -> users.User:
 	"""Fetch a single user by its username."""
-	user = get_user_by_username_db(username, session)
-	if user:
+	return await _cached_user(request, user_cache.key("username", username), session, get_user_by_username_db, username)
+
+
+async def _cached_user(request: Request, cache_key: str, session: Session, lookup, *args):
+	"""Serve a user from the response cache, or look it up and cache it tagged ``user:<id>``.
+
+	Clients pinned to the primary after a write bypass the cache.
+	"""
+	use_cache = user_cache.enabled and not is_sticky_request(request)
+	cached = await user_cache.get_response(cache_key) if use_cache else None
+	if cached:
+		return cached
+	cache_version = await user_cache.version() if use_cache else None
+	user = await run_db(session, lookup, *args)
+	if not user:
+		raise AppException(status_code=404, detail="User not found")
+	if not use_cache:
 		return user
-	raise AppException(status_code=404, detail="User not found")
-	    
-	
-
+	body = _user_adapter.dump_json(_user_adapter.validate_python(user, from_attributes=True))
+	await user_cache.store(cache_key, body, [f"user:{user.id}"], since=cache_version)
+	return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
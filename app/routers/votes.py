@@ -1,41 +1,60 @@
 from fastapi import APIRouter, Depends
-from sqlmodel import select
 
 from .. import models, schemas, utils
-from ..models.db_orm import SessionDep
+from ..config import settings
+from ..models.db_orm import DBSessionDep, run_db
+from ..utils.cache import post_cache
+from ..utils.vote_buffer import vote_buffer
 
 router = APIRouter(prefix="/votes", tags=["votes"])
 
 @router.post("/", status_code=201, response_model=schemas.VoteResponse)
 async def create_vote(
     vote: schemas.VoteCreate, 
-    current_user: schemas.User = Depends(utils.get_current_user), 
-    session: SessionDep = None
+    current_user: utils.CurrentPrincipal, 
+    session: DBSessionDep = None
 ) -> schemas.VoteResponse:
     """Create a new vote entry."""
+    if settings.vote_buffer_enabled:
+        return await _submit_buffered_vote(vote, current_user.id)
+    
     vote_dict = vote.dict()
     vote_dict["user_id"] = current_user.id
     
     # Check if user has already voted for this post
-    existing_vote = session.exec(
-        select(models.Votes).where(
-            (models.Votes.post_id == vote.post_id) & 
-            (models.Votes.user_id == current_user.id)
-        )
-    ).first()
+    existing_vote = await run_db(
+        session, models.votes.get_vote_from_db_by_model, vote.post_id, current_user.id
+    )
     
     if vote.direction == 1:
         if existing_vote:
             raise utils.AppException(status_code=409, detail="User has already voted on this post")
-        new_vote = models.votes.create_vote_in_db_by_model(vote_dict, session)
-        if new_vote:
-            print("Vote created successfully")
-            return new_vote
-        raise utils.AppException(status_code=404, detail="Vote not created")
+        new_vote = await run_db(session, models.votes.create_vote_in_db_by_model, vote_dict)
+        if not new_vote:
+            # Cast by a concurrent request since the check above
+            raise utils.AppException(status_code=409, detail="User has already voted on this post")
+        await post_cache.invalidate(f"post:{vote.post_id}", "list:votes")
+        return new_vote
     else:  # direction == 0
         if not existing_vote:
             raise utils.AppException(status_code=404, detail="No vote found to remove")
         vote_dict.pop("direction", None)
-        deleted_vote = models.votes.delete_vote_in_db_by_model(vote_dict, session)
+        deleted_vote = await run_db(session, models.votes.delete_vote_in_db_by_model, vote_dict)
+        if not deleted_vote:
+            # Removed by a concurrent request since the check above
+            raise utils.AppException(status_code=404, detail="No vote found to remove")
+        await post_cache.invalidate(f"post:{vote.post_id}", "list:votes")
         return deleted_vote
-    
\ No newline at end of file
+
+
+async def _submit_buffered_vote(vote: schemas.VoteCreate, user_id: int) -> dict:
+    """Apply a vote through the write-behind buffer and map its outcome to a response."""
+    outcome, row = await vote_buffer.submit(vote.post_id, user_id, vote.direction)
+    if outcome == "conflict":
+        raise utils.AppException(status_code=409, detail="User has already voted on this post")
+    if outcome == "post_not_found":
+        raise utils.AppException(status_code=404, detail="Post not found")
+    if outcome == "not_found":
+        raise utils.AppException(status_code=404, detail="No vote found to remove")
+    await post_cache.invalidate(f"post:{vote.post_id}", "list:votes")
+    return row
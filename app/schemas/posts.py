@@ -1,8 +1,9 @@
 import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
+from ..config import settings
 from ..schemas.users import User
 
 class DBConfig(BaseModel):
@@ -25,8 +26,7 @@ class Post(BaseModel):
 class Posts(BaseModel):
 	posts: List[Post]
 
-	class Config:
-		orm_mode = True
+	model_config = ConfigDict(from_attributes=True)
 
 
 class PostCreate(BaseModel):
@@ -34,8 +34,7 @@ class PostCreate(BaseModel):
 	content: str
 	published: bool = True
 
-	class Config:
-		orm_mode = True
+	model_config = ConfigDict(from_attributes=True)
 
 
 class PostUpdate(BaseModel):
@@ -46,12 +45,35 @@ class PostUpdate(BaseModel):
 class PostOut(Post):
 	owner: User
 
-	class Config:
-		orm_mode = True
+	model_config = ConfigDict(from_attributes=True)
 
 class PostOutWithVotes(BaseModel):
 	Posts: PostOut
 	votes: int
 
-	class Config:
-		orm_mode = True	
\ No newline at end of file
+	model_config = ConfigDict(from_attributes=True)
+
+
+class PostBatchRequest(BaseModel):
+	# Bounded here so an oversized body is rejected before every id is validated
+	ids: List[int] = Field(..., min_length=1, max_length=settings.posts_batch_max_ids)
+
+
+class PostBatchOut(BaseModel):
+	posts: List[PostOutWithVotes]
+	missing: List[int]
+
+
+class PostBulkCreated(BaseModel):
+	index: int
+	id: int
+
+
+class PostBulkError(BaseModel):
+	index: int
+	detail: str
+
+
+class PostBulkOut(BaseModel):
+	created: List[PostBulkCreated]
+	errors: List[PostBulkError]
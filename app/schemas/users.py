@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 
 
@@ -12,8 +12,7 @@ class UserCreate(BaseModel):
     username: str
     email: EmailStr
     password: str
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserCreateResponse(BaseModel):
     id: int
@@ -29,6 +28,12 @@ class LoginResponse(BaseModel):
     access_token: str
     token_type: str
     username: str
+    # Set with ACCESS_TOKEN_FORMAT=claims: exchange at POST /auth/refresh before expires_in seconds
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class Token(BaseModel):
     access_token: str
@@ -1,15 +1,14 @@
 from datetime import datetime
 from typing import Annotated, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class VoteCreate(BaseModel):
     post_id: int
     direction: Annotated[int, Field(ge=0, le=1)]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class VoteResponse(BaseModel):
@@ -17,5 +16,4 @@ class VoteResponse(BaseModel):
     user_id: int
     date: Optional[datetime] = None
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,8 +1,14 @@
-from .auth import get_current_user
+from .auth import CurrentPrincipal, get_current_principal, get_current_user
 from .helpers import AppException, app_exception_handler
+from .revocation import revocation_list
+from .token_cache import token_cache
 
 __all__ = [
+    "CurrentPrincipal",
+    "get_current_principal",
     "get_current_user",
     "AppException",
     "app_exception_handler",
+    "revocation_list",
+    "token_cache",
 ]
@@ -1,6 +1,8 @@
 import json
-from datetime import datetime, timedelta
-from typing import Optional
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Optional
 import paseto
 from paseto.keys.symmetric_key import SymmetricKey
 from fastapi import Depends, HTTPException, status
@@ -8,9 +10,11 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session
 
 from ..config import settings
-from ..models.db_orm import get_session
+from ..models.db_orm import get_db_session, run_db
 from ..models import get_user_by_username_db
 from ..models.users import User
+from .revocation import revocation_list
+from .token_cache import token_cache
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -23,9 +27,18 @@ def get_secret_key() -> SymmetricKey:
     return SymmetricKey.v4(key_bytes)
 
 
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller as stated by its access token."""
+    id: int
+    username: str
+    email: str
+
+
 def create_paseto_token(
     username: str,
-    expires_in_minutes: int = None
+    expires_in_minutes: int = None,
+    claims: Optional[dict] = None
 ) -> str:
     """
     Create a PASETO token with user information.
@@ -33,6 +46,7 @@ def create_paseto_token(
     Args:
         username: The username
         expires_in_minutes: Token expiration time in minutes (default: from settings)
+        claims: Extra claims to embed next to the username
         
     Returns:
         The encrypted PASETO token as a string
@@ -48,6 +62,7 @@ def create_paseto_token(
     
     token_data = {
         "username": username,
+        **(claims or {}),
         "iat": now.isoformat(),
         "exp": expires_at.isoformat(),
     }
@@ -90,9 +105,97 @@ def verify_paseto_token(token: str) -> dict:
         raise ValueError(f"Invalid token: {str(e)}")
 
 
-def get_current_user(
+def create_access_token(user: User) -> str:
+    """
+    Create an access token for a user in the configured ACCESS_TOKEN_FORMAT.
+
+    ``claims`` tokens also carry the user id and email plus a ``jti`` for
+    revocation, and expire after CLAIMS_ACCESS_TOKEN_MINUTES.
+    """
+    if settings.access_token_format != "claims":
+        return create_paseto_token(username=user.username, expires_in_minutes=60)
+    return create_paseto_token(
+        username=user.username,
+        expires_in_minutes=settings.claims_access_token_minutes,
+        claims={"typ": "access", "uid": user.id, "email": user.email, "jti": uuid.uuid4().hex},
+    )
+
+
+def create_refresh_token(user_id: int) -> tuple[str, str, datetime]:
+    """
+    Create a refresh token; returns the token, its ``jti`` and its (naive UTC) expiry.
+
+    Only the id is embedded: the token is checked against the ``refresh_token``
+    table whenever it is used.
+    """
+    jti = uuid.uuid4().hex
+    expires_at = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
+    token = paseto.create(
+        key=get_secret_key(),
+        claims={"typ": "refresh", "uid": user_id, "jti": jti},
+        purpose="local",
+        exp_seconds=settings.refresh_token_expire_days * 86400
+    )
+    return token, jti, expires_at
+
+
+def verify_refresh_token(token: str) -> dict:
+    """Verify a refresh token and return its claims; raises ValueError otherwise."""
+    message = verify_paseto_token(token)["message"]
+    if message.get("typ") != "refresh" or "jti" not in message:
+        raise ValueError("Invalid token: not a refresh token")
+    return message
+
+
+def claim_datetime(iso_timestamp: str) -> datetime:
+    """Turn an ISO ``exp``/``iat`` claim into the naive UTC datetime stored in the database."""
+    value = datetime.fromisoformat(iso_timestamp)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_access_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    """
+    Verify an access token and return its claims, without touching the database.
+
+    Refresh tokens and revoked access tokens are rejected.
+    
+    Raises:
+        HTTPException: If the token is invalid, expired, revoked or not an access token
+    """
+    try:
+        message = verify_paseto_token(token)["message"]
+    except ValueError:
+        raise _credentials_exception()
+    if message.get("typ", "access") != "access" or message.get("username") is None:
+        raise _credentials_exception()
+    jti = message.get("jti")
+    if jti and revocation_list.is_revoked(jti):
+        raise _credentials_exception()
+    return message
+
+
+async def _load_user(token: str, claims: dict, session: Session) -> User:
+    """Look up the user named by verified claims and cache it for the token."""
+    user = await run_db(session, get_user_by_username_db, claims["username"])
+    if user is None:
+        raise _credentials_exception()
+    token_cache.put(token, user, claims.get("exp"))
+    return user
+
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_db_session)
 ) -> User:
     """
     Get the current authenticated user from the token.
@@ -107,25 +210,36 @@ def get_current_user(
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    # Tokens verified recently skip the decrypt and the user lookup; claims-format
+    # tokens may be cached as a Principal, which is not enough here
+    user = token_cache.get(token)
+    if isinstance(user, User):
+        return user
     
-    try:
-        # Verify and decode the token
-        claims = verify_paseto_token(token)
-        username: str = claims["message"].get("username")
-        print
-        if username is None:
-            raise credentials_exception            
-    except ValueError:
-        raise credentials_exception
-    # Fetch user from database
-    user = get_user_by_username_db(username, session)
-   
-    if user is None:
-        raise credentials_exception
-    
-    return user
+    claims = await get_access_claims(token)
+    return await _load_user(token, claims, session)
+
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    session: Session = Depends(get_db_session)
+) -> Principal:
+    """
+    Get the caller's id, username and email for routes that need nothing else.
+
+    Tokens verified recently skip the decrypt. Otherwise claims-format tokens
+    resolve from the token alone; the session (lazy, so it costs nothing then)
+    is only used for username-format tokens.
+    """
+    cached = token_cache.get(token)
+    if cached is None:
+        claims = await get_access_claims(token)
+        if "uid" in claims and "email" in claims:
+            principal = Principal(id=claims["uid"], username=claims["username"], email=claims["email"])
+            token_cache.put(token, principal, claims.get("exp"))
+            return principal
+        cached = await _load_user(token, claims, session)
+    return Principal(id=cached.id, username=cached.username, email=cached.email)
+
+
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
@@ -0,0 +1,537 @@
+import hashlib
+import json
+import mmap
+import os
+import stat
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+from prometheus_client import Counter
+from starlette.responses import Response
+
+from ..config import settings
+
+CACHE_LOOKUPS = Counter("response_cache_lookups_total", "Response cache lookups", ["cache", "result"])
+CACHE_SKIPPED_STORES = Counter(
+    "response_cache_skipped_stores_total",
+    "Responses not cached: invalidated by a write while they were built, or too large for the backend",
+    ["cache"],
+)
+CACHE_ERRORS = Counter(
+    "response_cache_errors_total",
+    "Response cache backend failures (treated as misses, skipped stores or skipped invalidations)",
+    ["cache", "operation"],
+)
+
+
+class CacheBackend:
+    """
+    Interface for response cache storage: bytes values with a TTL and invalidation tags.
+
+    Every invalidation advances a version. Take ``version()`` before loading the data
+    for an entry and pass it to ``set`` as ``since``: the entry is then dropped if
+    one of its tags was invalidated in between, instead of caching stale data.
+
+    ``errors`` lists the exceptions a backend raises when its storage is
+    unavailable; ResponseCache catches them so the cache never fails a request.
+    """
+
+    errors: tuple = (OSError,)
+
+    async def version(self) -> int:
+        """Current invalidation version."""
+        raise NotImplementedError
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int, tags: Iterable[str] = (), since: Optional[int] = None) -> bool:
+        """Store ``value``; returns False when it was not cached (stale since ``since``, or too large)."""
+        raise NotImplementedError
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        """Drop every entry stored with any of ``tags``."""
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU with per-entry TTL. Invalidations only reach the current worker."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes, tuple[str, ...]]] = OrderedDict()
+        self._keys_by_tag: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+        # Version at which each recently invalidated tag was last invalidated. Bounded:
+        # forgotten tags count as invalidated at ``_floor``, which only costs extra misses.
+        self._version = 0
+        self._floor = 0
+        self._tag_versions: OrderedDict[str, int] = OrderedDict()
+        self._max_tag_versions = max(1024, max_entries)
+
+    async def version(self) -> int:
+        return self._version
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int, tags: Iterable[str] = (), since: Optional[int] = None) -> bool:
+        tags = tuple(tags)
+        with self._lock:
+            if since is not None and (since < self._floor or any(self._tag_versions.get(tag, 0) > since for tag in tags)):
+                return False
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl_seconds, value, tags)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        return True
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            self._version += 1
+            for tag in tags:
+                self._tag_versions.pop(tag, None)
+                self._tag_versions[tag] = self._version
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+            while len(self._tag_versions) > self._max_tag_versions:
+                _tag, self._floor = self._tag_versions.popitem(last=False)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend for any Redis-protocol server (Redis, Valkey, KeyDB, Dragonfly, ...).
+
+    Tags are Redis sets of keys, so invalidations are shared by every worker.
+    Each invalidation also records a version per tag (``tagv:<tag>``, from the
+    ``tagv:seq`` counter) for the stale-store check in ``set``.
+    Pass ``client`` to use an existing ``redis.asyncio``-compatible client, e.g. a
+    local stand-in such as ``fakeredis.aioredis.FakeRedis``.
+    """
+
+    VERSION_KEY = "tagv:seq"
+
+    def __init__(self, url: str, client=None, version_ttl_seconds: int = 3600):
+        self.version_ttl_seconds = version_ttl_seconds
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError:
+                raise RuntimeError("redis is not installed. Install it with: pip install redis")
+            client = redis.from_url(url)
+        try:
+            from redis.exceptions import RedisError
+            self.errors = (RedisError, OSError)
+        except ImportError:
+            pass
+        self._client = client
+
+    async def version(self) -> int:
+        return int(await self._client.get(self.VERSION_KEY) or 0)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int, tags: Iterable[str] = (), since: Optional[int] = None) -> bool:
+        tags = tuple(tags)
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.set(key, value, ex=ttl_seconds)
+            for tag in tags:
+                pipe.sadd(f"tag:{tag}", key)
+                pipe.expire(f"tag:{tag}", ttl_seconds)
+            await pipe.execute()
+        if since is None or not tags:
+            return True
+        # Checked after storing: an invalidation that bumped a version before this
+        # point is caught here, and a later one finds the key in the tag sets
+        versions = await self._client.mget([f"tagv:{tag}" for tag in tags])
+        if any(int(version or 0) > since for version in versions):
+            await self._client.delete(key)
+            return False
+        return True
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        tags = tuple(tags)
+        if not tags:
+            return
+        version = await self._client.incr(self.VERSION_KEY)
+        async with self._client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.set(f"tagv:{tag}", version, ex=self.version_ttl_seconds)
+            await pipe.execute()
+        tag_keys = [f"tag:{tag}" for tag in tags]
+        async with self._client.pipeline(transaction=False) as pipe:
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = await pipe.execute()
+        keys = {key for keys in members for key in keys}
+        if keys or tag_keys:
+            await self._client.delete(*keys, *tag_keys)
+
+
+class SharedMemoryCacheBackend(CacheBackend):
+    """
+    One memory-mapped file shared by every worker on the host, split into fixed-size slots.
+
+    Keys hash to a set of ``ways`` slots; a full set evicts with CLOCK (a slot read
+    since the hand last passed gets a second chance). Tags are not indexed: each
+    tag hashes to a generation counter, an entry records the generations of its
+    tags when stored, and invalidating a tag moves its counter to the next value
+    of a file-wide sequence, so every entry stored under the old generation
+    becomes a miss without scanning slots. Tags sharing a counter only cause
+    extra misses. ``version()`` is that sequence: ``set`` refuses an entry whose
+    tags moved past the ``since`` its caller took before loading the data.
+
+    Readers take no lock: a slot carries a sequence number that is odd while it
+    is written, and a read is retried when the number changed under it. Writers
+    lock the slot's set, and invalidations the generation table, with a per-thread
+    lock plus a POSIX byte-range lock on the file (``fcntl.lockf``). Values that do
+    not fit a slot are not cached.
+
+    The file must be a regular file owned by the current user and private to it,
+    otherwise another local user could read or plant responses.
+    """
+
+    MAGIC = b"KPISHMC2"
+    # magic, slot bytes, slots, ways, tag counters; padded to 64 bytes, with the invalidation
+    # sequence at SEQ_OFFSET and the last byte locking the tag table
+    HEADER = struct.Struct("<8sIIII")
+    HEADER_SIZE = 64
+    SEQ_OFFSET = 32
+    TAG_LOCK_OFFSET = 63
+    # sequence, key digest, expires (epoch seconds, 0 = empty), value length, tag count, CLOCK bit
+    SLOT = struct.Struct("<Q16sdIHB")
+    SLOT_HEADER_SIZE = 40
+    REF_OFFSET = 38
+    TAG_REF = struct.Struct("<IQ")
+    U32 = struct.Struct("<I")
+    U64 = struct.Struct("<Q")
+
+    def __init__(self, path: str, slots: int, slot_bytes: int, ways: int = 8, tag_slots: int = 65536):
+        try:
+            import fcntl
+        except ImportError:
+            raise RuntimeError("The shared cache backend needs fcntl (Linux or another POSIX system)")
+        self._fcntl = fcntl
+        self.path = path
+        self.ways = ways
+        self.sets = max(1, slots // ways)
+        self.slots = self.sets * ways
+        self.slot_bytes = max(128, slot_bytes // 8 * 8)
+        self.tag_slots = tag_slots
+        self.hands_offset = self.HEADER_SIZE
+        self.tags_offset = self.hands_offset + (self.sets * 4 + 7) // 8 * 8
+        self.slots_offset = self.tags_offset + tag_slots * 8
+        self.size = self.slots_offset + self.slots * self.slot_bytes
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+        st = os.fstat(self._fd)
+        if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+            os.close(self._fd)
+            raise RuntimeError(
+                f"Shared cache file {path} must be a regular file owned by this user with mode 0600; "
+                "remove it or set SHARED_CACHE_PATH"
+            )
+        self._init_file()
+        self._mm = mmap.mmap(self._fd, self.size)
+
+    def _init_file(self) -> None:
+        """Size and stamp the file unless another worker already did, with the same geometry."""
+        header = self.HEADER.pack(self.MAGIC, self.slot_bytes, self.slots, self.ways, self.tag_slots)
+        self._fcntl.lockf(self._fd, self._fcntl.LOCK_EX, self.HEADER_SIZE - 1, 0)
+        try:
+            if os.fstat(self._fd).st_size != self.size or os.pread(self._fd, len(header), 0) != header:
+                # Truncating first zeroes every slot; tmpfs only allocates the pages that get used
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, self.size)
+                os.pwrite(self._fd, header, 0)
+        finally:
+            self._fcntl.lockf(self._fd, self._fcntl.LOCK_UN, self.HEADER_SIZE - 1, 0)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        digest = _digest(key)
+        set_index = int.from_bytes(digest[:8], "little") % self.sets
+        for way in range(self.ways):
+            offset = self.slots_offset + (set_index * self.ways + way) * self.slot_bytes
+            entry = self._read_slot(offset, digest)
+            if entry is None:
+                continue
+            expires, tag_refs, value = entry
+            if expires <= time.time() or any(self._generation(index) != generation for index, generation in tag_refs):
+                return None
+            self._mm[offset + self.REF_OFFSET] = 1
+            return value
+        return None
+
+    def _read_slot(self, offset: int, digest: bytes):
+        """Snapshot a slot holding ``digest``; None when it holds another key."""
+        mm = self._mm
+        for _ in range(4):
+            seq, key, expires, length, tag_count, _ref = self.SLOT.unpack_from(mm, offset)
+            if key != digest or not expires:
+                return None
+            if seq & 1:
+                continue
+            tags_start = offset + self.SLOT_HEADER_SIZE
+            tag_refs = [self.TAG_REF.unpack_from(mm, tags_start + i * self.TAG_REF.size) for i in range(tag_count)]
+            value_start = tags_start + tag_count * self.TAG_REF.size
+            # The one copy out of shared memory; later reads of the slot may see it rewritten
+            value = mm[value_start:value_start + length]
+            if self.U64.unpack_from(mm, offset)[0] == seq:
+                return expires, tag_refs, value
+        return None
+
+    async def version(self) -> int:
+        return self.U64.unpack_from(self._mm, self.SEQ_OFFSET)[0]
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int, tags: Iterable[str] = (), since: Optional[int] = None) -> bool:
+        tag_indexes = sorted({int.from_bytes(_digest(tag)[:4], "little") % self.tag_slots for tag in tags})
+        needed = self.SLOT_HEADER_SIZE + len(tag_indexes) * self.TAG_REF.size + len(value)
+        if needed > self.slot_bytes:
+            return False
+        digest = _digest(key)
+        set_index = int.from_bytes(digest[:8], "little") % self.sets
+        with self._locked(self.hands_offset + set_index * 4, 4):
+            generations = [self._generation(index) for index in tag_indexes]
+            if since is not None and any(generation > since for generation in generations):
+                return False
+            # An invalidation from here on moves a generation past the recorded one: a miss
+            offset = self._pick_slot(set_index, digest)
+            mm = self._mm
+            seq = self.U64.unpack_from(mm, offset)[0]
+            self.U64.pack_into(mm, offset, seq + 1)
+            tag_refs = b"".join(self.TAG_REF.pack(index, generation) for index, generation in zip(tag_indexes, generations))
+            tags_start = offset + self.SLOT_HEADER_SIZE
+            mm[tags_start:tags_start + len(tag_refs)] = tag_refs
+            value_start = tags_start + len(tag_refs)
+            mm[value_start:value_start + len(value)] = value
+            self.SLOT.pack_into(mm, offset, seq + 1, digest, time.time() + ttl_seconds, len(value), len(tag_indexes), 0)
+            self.U64.pack_into(mm, offset, seq + 2)
+        return True
+
+    def _pick_slot(self, set_index: int, digest: bytes) -> int:
+        """Slot for ``digest`` in its set: its current slot, a free or expired one, or the CLOCK victim."""
+        mm = self._mm
+        first = self.slots_offset + set_index * self.ways * self.slot_bytes
+        now = time.time()
+        free = None
+        for way in range(self.ways):
+            offset = first + way * self.slot_bytes
+            _seq, key, expires, *_ = self.SLOT.unpack_from(mm, offset)
+            if key == digest:
+                return offset
+            if free is None and expires <= now:
+                free = offset
+        if free is not None:
+            return free
+        hand_offset = self.hands_offset + set_index * 4
+        hand = self.U32.unpack_from(mm, hand_offset)[0]
+        while True:
+            offset = first + hand % self.ways * self.slot_bytes
+            hand = (hand + 1) % self.ways
+            if mm[offset + self.REF_OFFSET]:
+                mm[offset + self.REF_OFFSET] = 0
+                continue
+            self.U32.pack_into(mm, hand_offset, hand)
+            self.evictions += 1
+            return offset
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        indexes = {int.from_bytes(_digest(tag)[:4], "little") % self.tag_slots for tag in tags}
+        with self._locked(self.TAG_LOCK_OFFSET, 1):
+            version = self.U64.unpack_from(self._mm, self.SEQ_OFFSET)[0] + 1
+            self.U64.pack_into(self._mm, self.SEQ_OFFSET, version)
+            for index in indexes:
+                self.U64.pack_into(self._mm, self.tags_offset + index * 8, version)
+
+    def _generation(self, index: int) -> int:
+        return self.U64.unpack_from(self._mm, self.tags_offset + index * 8)[0]
+
+    @contextmanager
+    def _locked(self, start: int, length: int):
+        with self._lock:
+            self._fcntl.lockf(self._fd, self._fcntl.LOCK_EX, length, start)
+            try:
+                yield
+            finally:
+                self._fcntl.lockf(self._fd, self._fcntl.LOCK_UN, length, start)
+
+    def stats(self) -> dict:
+        now = time.time()
+        used = sum(
+            1 for slot in range(self.slots)
+            if self.SLOT.unpack_from(self._mm, self.slots_offset + slot * self.slot_bytes)[2] > now
+        )
+        return {"slots": self.slots, "slot_bytes": self.slot_bytes, "used": used, "evictions": self.evictions}
+
+
+def _digest(value: str) -> bytes:
+    return hashlib.blake2b(value.encode(), digest_size=16).digest()
+
+
+def default_shared_cache_path() -> str:
+    """``/dev/shm`` (memory-backed) when it exists, else the temp dir; one file per APP_ENV."""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"kpi-one-cache-{settings.app_env}")
+
+
+class ResponseCache:
+    """
+    Caches serialized JSON responses (body plus selected headers) on a CacheBackend.
+
+    Entries are tagged so writes can invalidate exactly the responses they affect.
+    Take ``version()`` before reading the data of a response and pass it to
+    ``store`` so a write landing in between is not cached over. Hits and misses
+    are exported as ``response_cache_lookups_total``; ``stats()`` has the
+    per-process numbers.
+
+    The cache is optional, so a backend that is down (``backend.errors``) never
+    fails a request: a failed lookup is a miss, a failed store or invalidation is
+    logged and skipped, and each failure counts in ``response_cache_errors_total``.
+    """
+
+    # version() when the backend failed to answer; store() refuses it
+    UNKNOWN_VERSION = -1
+
+    def __init__(self, backend: Optional[CacheBackend], ttl_seconds: int, namespace: str):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def key(self, *parts) -> str:
+        """Build a cache key from request parameters."""
+        digest = hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    async def get_response(self, key: str) -> Optional[Response]:
+        """Return the cached response for ``key``, or None on a miss."""
+        if self.backend is None:
+            return None
+        try:
+            value = await self.backend.get(key)
+        except self.backend.errors as e:
+            self._failed("get", e)
+            value = None
+        if value is None:
+            self.misses += 1
+            CACHE_LOOKUPS.labels(self.namespace, "miss").inc()
+            return None
+        self.hits += 1
+        CACHE_LOOKUPS.labels(self.namespace, "hit").inc()
+        # Slice the body out without copying it again
+        newline = value.index(b"\n")
+        headers = json.loads(value[:newline])
+        headers["X-Cache"] = "HIT"
+        return Response(content=memoryview(value)[newline + 1:], media_type="application/json", headers=headers)
+
+    async def version(self) -> Optional[int]:
+        """Invalidation version to pass to ``store``; take it before reading the data."""
+        if self.backend is None:
+            return None
+        try:
+            return await self.backend.version()
+        except self.backend.errors as e:
+            self._failed("version", e)
+            return self.UNKNOWN_VERSION
+
+    async def store(self, key: str, body: bytes, tags: Iterable[str], headers: Optional[dict] = None, since: Optional[int] = None) -> None:
+        if self.backend is None:
+            return
+        if since == self.UNKNOWN_VERSION:
+            # Without a version an invalidation during the read would go unnoticed
+            CACHE_SKIPPED_STORES.labels(self.namespace).inc()
+            return
+        value = json.dumps(headers or {}).encode() + b"\n" + body
+        try:
+            stored = await self.backend.set(key, value, self.ttl_seconds, tags, since=since)
+        except self.backend.errors as e:
+            self._failed("set", e)
+            return
+        if not stored:
+            CACHE_SKIPPED_STORES.labels(self.namespace).inc()
+
+    async def invalidate(self, *tags: str) -> None:
+        if self.backend is None:
+            return
+        try:
+            await self.backend.invalidate_tags(tags)
+        except self.backend.errors as e:
+            # Entries for these tags stay cached until their TTL runs out
+            self._failed("invalidate", e)
+
+    def _failed(self, operation: str, error: Exception) -> None:
+        CACHE_ERRORS.labels(self.namespace, operation).inc()
+        print(f"Warning: {self.namespace} cache {operation} failed: {error}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def create_cache_backend(name: str) -> Optional[CacheBackend]:
+    """Build the backend named by POST_CACHE_BACKEND (none, memory, shared or redis)."""
+    if name == "memory":
+        return MemoryCacheBackend(max_entries=settings.post_cache_max_entries)
+    if name == "shared":
+        return SharedMemoryCacheBackend(
+            path=settings.shared_cache_path or default_shared_cache_path(),
+            slots=settings.post_cache_max_entries,
+            slot_bytes=settings.shared_cache_slot_bytes,
+        )
+    if name == "redis":
+        return RedisCacheBackend(url=settings.redis_url)
+    return None
+
+
+_backend = create_cache_backend(settings.post_cache_backend)
+
+# Cache for GET /posts and GET /posts/{id}
+post_cache = ResponseCache(
+    backend=_backend,
+    ttl_seconds=settings.post_cache_ttl_seconds,
+    namespace="posts",
+)
+
+# Cache for GET /users/{id} and /users/{username}, on the same backend
+user_cache = ResponseCache(
+    backend=_backend,
+    ttl_seconds=settings.post_cache_ttl_seconds,
+    namespace="users",
+)
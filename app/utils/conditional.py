@@ -0,0 +1,58 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def post_rows_etag(rows: Iterable, *extra) -> str:
+    """
+    Strong ETag for post rows (``Row(Posts, votes)``), computed before serialization.
+
+    Every field of the response is covered: ``updated_at`` moves on edits and vote
+    changes, the vote count is included directly, and ``extra`` carries anything
+    else that shapes the body (e.g. the next cursor).
+    """
+    digest = hashlib.sha1()
+    for row in rows:
+        post = row.Posts
+        digest.update(f"{post.id}:{post.updated_at.isoformat()}:{row.votes}:{post.owner_id};".encode())
+    for value in extra:
+        digest.update(f"{value};".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive-UTC or aware datetime as an HTTP-date."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: Optional[str], last_modified: Optional[str] = None) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since for a GET.
+
+    If-None-Match wins when present; If-Modified-Since is only consulted without it.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def not_modified_response(headers) -> Response:
+    """304 carrying the validators (and the cursor) of the unchanged representation."""
+    kept = {key: value for key, value in headers.items() if key.lower() in ("etag", "last-modified", "x-next-cursor")}
+    return Response(status_code=304, headers=kept)
@@ -1,12 +1,20 @@
 import os
+import threading
+
 import psycopg
 from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
 
+from ..config import settings
 from ..schemas.posts import DBConfig
 from .helpers import _load_json
 
 DB_CONFIG = _load_json("db_config.json")
 
+# One pool per db_config.json environment key, opened on first use
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
 
 def _resolve_env_reference(value):
     if isinstance(value, str) and value.startswith("env:"):
@@ -18,10 +26,60 @@ def _resolve_env_reference(value):
     return value
 
 
+def _conninfo(env: str) -> str:
+    """Build a libpq connection string for ``env``, resolving ``env:`` references."""
+    db_config = DB_CONFIG[0].get(env)
+    if not db_config:
+        raise KeyError(f"Environment '{env}' not found in db_config.json")
+    return psycopg.conninfo.make_conninfo(
+        host=_resolve_env_reference(db_config["host"]),
+        port=_resolve_env_reference(db_config["port"]),
+        dbname=_resolve_env_reference(db_config["dbname"]),
+        user=_resolve_env_reference(db_config["user"]),
+        password=_resolve_env_reference(db_config["password"]),
+    )
+
+
+def get_pool(env: str = "local") -> ConnectionPool:
+    """
+    Return the connection pool for ``env``, creating it on first use.
+
+    The config is read and ``env:`` references resolved once per pool. Sizes and the
+    checkout timeout come from the RAW_DB_POOL_* settings.
+    """
+    pool = _pools.get(env)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(env)
+            if pool is None:
+                pool = ConnectionPool(
+                    _conninfo(env),
+                    min_size=settings.raw_db_pool_min_size,
+                    max_size=settings.raw_db_pool_max_size,
+                    timeout=settings.raw_db_pool_timeout,
+                    kwargs={"row_factory": dict_row},
+                    name=f"db_sql-{env}",
+                    open=True,
+                )
+                _pools[env] = pool
+    return pool
+
+
+def close_pools():
+    """Close every pool opened by this module (call on shutdown)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
 def get_db_connection(env: str = "local"):
     """
     Establishes and returns a new database connection and cursor using psycopg (psycopg3).
 
+    The connection bypasses the pool and must be closed by the caller; the query
+    helpers below use get_pool() instead.
+
     Args:
         env (str): Environment configuration key (default: "local").
                    Must match a key in db_config.json
@@ -34,19 +92,7 @@ def get_db_connection(env: str = "local"):
         Exception: If the connection to the database fails or environment config not found.
     """
     try:
-        # Get config for the specified environment
-        db_config = DB_CONFIG[0].get(env)
-        if not db_config:
-            raise KeyError(f"Environment '{env}' not found in db_config.json")
-
-        conn = psycopg.connect(
-            host=_resolve_env_reference(db_config["host"]),
-            port=_resolve_env_reference(db_config["port"]),
-            dbname=_resolve_env_reference(db_config["dbname"]),
-            user=_resolve_env_reference(db_config["user"]),
-            password=_resolve_env_reference(db_config["password"]),
-            row_factory=dict_row
-        )
+        conn = psycopg.connect(_conninfo(env), row_factory=dict_row)
         cur = conn.cursor()
         return conn, cur
     except Exception as e:
@@ -58,63 +104,55 @@ def __get_cursor(envName: str):
     return conn, cur
 
 
+# The fixed queries below run with prepare=True so each pooled connection parses and
+# plans them once and reuses the server-side prepared statement afterwards.
+
 def get_posts_from_db():
-    conn, cursor = get_db_connection()
-    try:
-        cursor.execute("""SELECT * FROM posts""")
-        posts = cursor.fetchall()
-        return posts
-    finally:
-        conn.close()
+    with get_pool().connection() as conn:
+        return conn.execute("""SELECT * FROM posts""", prepare=True).fetchall()
+
+
+def stream_posts_from_db(batch_size: int = 1000):
+    """
+    Yield posts one at a time through a server-side (named) cursor.
+
+    Unlike get_posts_from_db, only ``batch_size`` rows are held in memory at once.
+    """
+    with get_pool().connection() as conn:
+        with conn.cursor(name="posts_stream") as cursor:
+            cursor.itersize = batch_size
+            cursor.execute("""SELECT * FROM posts ORDER BY id""")
+            yield from cursor
 
 
 def get_post_from_db(post_id: int):
-    conn, cursor = get_db_connection()
-    try:
-        cursor.execute("""SELECT * FROM posts WHERE id = %s""", (post_id,))
-        post = cursor.fetchone()
-        return post
-    finally:
-        conn.close()
+    with get_pool().connection() as conn:
+        return conn.execute("""SELECT * FROM posts WHERE id = %s""", (post_id,), prepare=True).fetchone()
 
 
 def create_post_in_db(post: dict):
-    conn, cursor = get_db_connection()
-    try:
-        cursor.execute(
+    # The pool commits when the connection block exits without an error
+    with get_pool().connection() as conn:
+        return conn.execute(
             """INSERT INTO posts (title, content) VALUES (%s, %s) RETURNING *""",
-            (post["title"], post["content"])
-        )
-        new_post = cursor.fetchone()
-        conn.commit()
-        return new_post
-    finally:
-        conn.close()
+            (post["title"], post["content"]),
+            prepare=True,
+        ).fetchone()
 
 
 def update_post_in_db(post_id: int, post: dict):
-    conn, cursor = get_db_connection()
-    try:
-        cursor.execute(
+    with get_pool().connection() as conn:
+        return conn.execute(
             """UPDATE posts SET title = %s, content = %s, published = %s WHERE id = %s RETURNING *""",
-            (post["title"], post["content"], post["published"], post_id)
-        )
-        updated_post = cursor.fetchone()
-        conn.commit()
-        return updated_post
-    finally:
-        conn.close()
+            (post["title"], post["content"], post["published"], post_id),
+            prepare=True,
+        ).fetchone()
 
 
 def delete_post_from_db(post_id: int):
-    conn, cursor = get_db_connection()
-    try:
-        cursor.execute(
+    with get_pool().connection() as conn:
+        return conn.execute(
             """DELETE FROM posts WHERE id = %s RETURNING *""",
-            (post_id,)
-        )
-        deleted_post = cursor.fetchone()
-        conn.commit()
-        return deleted_post
-    finally:
-        conn.close()
+            (post_id,),
+            prepare=True,
+        ).fetchone()
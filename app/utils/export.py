@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator
+
+from sqlmodel import Session
+
+from ..config import settings
+from ..models.db_orm import engine
+from ..models.posts import EXPORT_COLUMNS, iter_posts_for_export
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _encode_ndjson(rows) -> bytes:
+    return "".join(json.dumps(dict(row), default=_json_default) + "\n" for row in rows).encode()
+
+
+def _encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row[name].isoformat() if isinstance(row[name], datetime) else row[name] for name in EXPORT_COLUMNS)
+    return buffer.getvalue().encode()
+
+
+def stream_posts_export(fmt: str) -> Iterator[bytes]:
+    """
+    Yield the posts table encoded as NDJSON or CSV, one chunk per fetched batch.
+
+    Runs in its own session on the sync engine (StreamingResponse iterates sync
+    generators in the threadpool), so the stream does not depend on the request
+    session still being open. Memory stays at one batch of POSTS_EXPORT_BATCH_SIZE rows.
+    """
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+    if fmt == "csv":
+        yield (",".join(EXPORT_COLUMNS) + "\r\n").encode()
+    with Session(engine) as session:
+        for rows in iter_posts_for_export(session, settings.posts_export_batch_size):
+            yield encode(rows)
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from ..config import settings
+from .helpers import AppException
+
+T = TypeVar("T")
+
+
+class HashingPool:
+    """
+    Bounded worker pool for Argon2 hashing and verification.
+
+    argon2-cffi releases the GIL while hashing, so a thread pool keeps the event
+    loop free. At most ``workers + queue_limit`` calls may be pending; further
+    calls are rejected with a 503 instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.capacity = workers + queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Run ``fn(*args)`` on the pool, raising AppException(503) when saturated."""
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.rejected += 1
+                raise AppException(status_code=503, detail="Server is busy, please retry")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": self._pending, "capacity": self.capacity, "rejected": self.rejected}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Process-wide pool used by the login and user creation routes
+hashing_pool = HashingPool(
+    workers=settings.password_hash_workers,
+    queue_limit=settings.password_hash_queue_limit,
+)
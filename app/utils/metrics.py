@@ -0,0 +1,94 @@
+import os
+import time
+
+from fastapi import Request
+from fastapi.responses import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from .sql_stats import track_statements
+
+# With several uvicorn workers, PROMETHEUS_MULTIPROC_DIR must point at a directory shared
+# by them (run.py sets one up); every worker writes its samples there and /metrics merges them.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+# Requests that matched no route share one label value so unknown paths cannot blow up cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status code", ["method", "route", "status"]
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "Time until the response headers are sent", ["method", "route"]
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being handled", multiprocess_mode="livesum"
+)
+SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements",
+    "SQL statements run per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+SQL_SECONDS = Histogram(
+    "http_request_sql_seconds",
+    "Total time spent in SQL statements per request",
+    ["method", "route"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+def _route_label(request: Request) -> str:
+    route = request.scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+async def record_request_metrics(request: Request, call_next):
+    """
+    HTTP middleware recording latency, status, in-flight count and SQL use per route.
+
+    Routes are labelled with their path template (``/posts/{post_id}``), not the raw
+    URL. SQL statements are counted through the engine events of ``sql_stats``.
+    """
+    if request.url.path == "/metrics":
+        return await call_next(request)
+    IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        with track_statements() as stats:
+            response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        IN_FLIGHT.dec()
+        route = _route_label(request)
+        REQUESTS.labels(request.method, route, str(status)).inc()
+        LATENCY.labels(request.method, route).observe(elapsed)
+        SQL_STATEMENTS.labels(request.method, route).observe(stats.count)
+        SQL_SECONDS.labels(request.method, route).observe(stats.total_seconds)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Expose all metrics in the Prometheus text format, merged across workers if needed."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_worker_dead():
+    """Drop this worker's live gauges from the shared directory (call on shutdown)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
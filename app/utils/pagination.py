@@ -0,0 +1,39 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from .helpers import AppException
+
+
+def encode_cursor(sort: str, key: Any, post_id: int) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor token."""
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    raw = json.dumps({"s": sort, "k": key, "id": post_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Optional[tuple[Any, int]]:
+    """
+    Decode a cursor produced by encode_cursor into its ``(key, id)`` pair.
+
+    Raises:
+        AppException: 400 if the cursor is malformed or was issued for another sort order
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data["s"] != sort:
+            raise AppException(status_code=400, detail="Cursor does not match the requested sort")
+        key = data["k"]
+        if sort == "date":
+            key = datetime.fromisoformat(key)
+        return key, int(data["id"])
+    except AppException:
+        raise
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise AppException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from datetime import datetime
+
+from ..config import settings
+from ..models.db_orm import run_db_in_new_session
+from ..models.tokens import get_revoked_tokens_db
+from .token_cache import token_cache
+
+
+class RevocationList:
+    """
+    In-memory set of revoked access token ids (``jti``), synced from ``revoked_token``.
+
+    Only unexpired revocations are kept, and claims-format access tokens are
+    short-lived, so the set stays small. A logout is visible at once in the worker
+    that handled it and in the other workers after their next sync.
+    """
+
+    def __init__(self):
+        self._revoked: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self.syncs = 0
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    def replace(self, rows) -> int:
+        """Swap in the rows loaded from the database; returns how many were not known before."""
+        revoked = dict(rows)
+        with self._lock:
+            added = len(revoked.keys() - self._revoked.keys())
+            self._revoked = revoked
+        return added
+
+    async def sync(self) -> None:
+        added = self.replace(await run_db_in_new_session(get_revoked_tokens_db))
+        self.syncs += 1
+        # The token cache maps tokens (not jtis) to users; drop it so other workers' logouts apply
+        if added:
+            token_cache.clear()
+
+    async def monitor(self, interval_seconds: float):
+        """Reload the revoked tokens every ``interval_seconds`` until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"Warning: token revocation sync failed: {e}")
+
+    def stats(self) -> dict:
+        return {"size": len(self._revoked), "syncs": self.syncs}
+
+
+# Process-wide list checked whenever an access token is decrypted (get_access_claims)
+revocation_list = RevocationList()
+
+# Claims-format tokens are the only ones that carry a jti
+revocation_enabled = settings.access_token_format == "claims"
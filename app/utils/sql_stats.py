@@ -0,0 +1,61 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class StatementStats:
+    """Number and total duration of SQL statements run while tracking is active."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+
+
+# Every active tracker in the current context, outermost first
+_active_stats: ContextVar[tuple[StatementStats, ...]] = ContextVar("sql_statement_stats", default=())
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count statements of ``engine`` into the StatementStats of the current context."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_sql_stats_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["_sql_stats_started"].pop()
+        for stats in _active_stats.get():
+            stats.count += 1
+            stats.total_seconds += elapsed
+
+
+@contextmanager
+def track_statements() -> Iterator[StatementStats]:
+    """
+    Collect statement stats for the enclosed block.
+
+    The stats travel through contextvars, so statements issued from the threadpool
+    (``run_in_threadpool``) or ``AsyncSession.run_sync`` are counted too. Trackers
+    nest: a statement counts towards every enclosing block.
+    """
+    stats = StatementStats()
+    token = _active_stats.set(_active_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+
+@contextmanager
+def statement_budget(max_statements: int) -> Iterator[StatementStats]:
+    """Fail with AssertionError when the enclosed block runs more than ``max_statements``."""
+    with track_statements() as stats:
+        yield stats
+    assert stats.count <= max_statements, (
+        f"Expected at most {max_statements} SQL statements, got {stats.count}"
+    )
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from ..config import settings
+
+
+class TokenCache:
+    """
+    Bounded LRU cache mapping verified access tokens to their resolved user (or Principal).
+
+    Entries expire after ``ttl_seconds`` or at the token's own ``exp``, whichever
+    comes first, so a cached token is never honoured past its expiry.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._tokens_by_user: dict[Any, set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> Optional[Any]:
+        """Return the cached user for a token, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return user
+
+    def put(self, token: str, user: Any, token_exp: Optional[str] = None) -> None:
+        """Cache a resolved user until the TTL or the token's ISO ``exp`` claim elapses."""
+        ttl = self.ttl_seconds
+        remaining = _seconds_until(token_exp)
+        if remaining is not None:
+            ttl = min(ttl, remaining)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (time.monotonic() + ttl, user)
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_token(self, token: str) -> None:
+        """Drop a single token from the cache."""
+        with self._lock:
+            self._remove(token)
+
+    def invalidate_user(self, user_id: Any) -> None:
+        """Drop every cached token of a user; call after the user is modified or deleted."""
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[1].id
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+def _seconds_until(iso_timestamp: Optional[str]) -> Optional[float]:
+    if not iso_timestamp:
+        return None
+    try:
+        expires_at = datetime.fromisoformat(iso_timestamp)
+    except (TypeError, ValueError):
+        return 0.0
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return (expires_at - datetime.now(timezone.utc)).total_seconds()
+
+
+# Process-wide cache of verified tokens (users, or principals for claims-format tokens)
+token_cache = TokenCache(
+    max_size=settings.token_cache_max_size if settings.token_cache_enabled else 0,
+    ttl_seconds=settings.token_cache_ttl_seconds,
+)
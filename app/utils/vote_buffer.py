@@ -0,0 +1,107 @@
+import asyncio
+from typing import Optional
+
+from ..config import settings
+from ..models.db_orm import run_db_in_new_session
+from ..models.votes import apply_vote_batch
+
+
+class VoteBuffer:
+    """
+    Write-behind buffer for ``POST /votes``.
+
+    Vote changes are collected for ``flush_ms`` milliseconds (or until ``max_batch``
+    are pending) and applied with one ``apply_vote_batch`` transaction. Each caller
+    awaits a future that resolves to its own ``(outcome, row)``, so responses stay
+    exact. Repeated changes to the same ``(post_id, user_id)`` are kept in arrival
+    order by deferring later ones to the next batch.
+    """
+
+    def __init__(self, flush_ms: int, max_batch: int):
+        self.flush_ms = flush_ms
+        self.max_batch = max_batch
+        self._pending: list[tuple[int, int, int, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.ops = 0
+
+    async def submit(self, post_id: int, user_id: int, direction: int) -> tuple[str, Optional[dict]]:
+        """Queue a vote change and wait for the batch that applies it."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((post_id, user_id, direction, future))
+        if len(self._pending) >= self.max_batch:
+            self._schedule(0)
+        else:
+            self._schedule(self.flush_ms / 1000)
+        return await future
+
+    async def close(self) -> None:
+        """Flush everything still pending; called from the app lifespan on shutdown."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flushing is not None:
+            await self._flushing
+        while self._pending:
+            await self._flush()
+
+    def _schedule(self, delay: float) -> None:
+        if self._flushing is not None:
+            return  # the running flush reschedules itself for whatever is left
+        if self._timer is not None:
+            if delay > 0:
+                return
+            self._timer.cancel()
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        self._flushing = asyncio.get_running_loop().create_task(self._flush_and_reschedule())
+
+    async def _flush_and_reschedule(self) -> None:
+        try:
+            await self._flush()
+        finally:
+            self._flushing = None
+            if self._pending:
+                self._schedule(0 if len(self._pending) >= self.max_batch else self.flush_ms / 1000)
+
+    async def _flush(self) -> None:
+        batch, deferred, keys = [], [], set()
+        for item in self._pending:
+            key = (item[0], item[1])
+            if key in keys or len(batch) >= self.max_batch:
+                deferred.append(item)
+            else:
+                keys.add(key)
+                batch.append(item)
+        self._pending = deferred
+        if not batch:
+            return
+
+        ops = [(post_id, user_id, direction) for post_id, user_id, direction, _ in batch]
+        try:
+            results = await run_db_in_new_session(apply_vote_batch, ops)
+        except Exception as exc:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        self.batches += 1
+        self.ops += len(batch)
+        for (*_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {"pending": len(self._pending), "batches": self.batches, "ops": self.ops}
+
+
+# Process-wide buffer used by POST /votes when VOTE_BUFFER_ENABLED is set
+vote_buffer = VoteBuffer(
+    flush_ms=settings.vote_buffer_flush_ms,
+    max_batch=settings.vote_buffer_max_batch,
+)
@@ -0,0 +1,8 @@
+"""
+Load/benchmark suite for the KPI-One API.
+
+Seeds the configured database with synthetic users, posts and votes, drives the
+ASGI app (in process, or a running server with --url) through the scenarios in
+``benchmarks.scenarios`` and reports latency percentiles and throughput per
+scenario. See ``python -m benchmarks --help``.
+"""
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Run the API benchmark suite.
+
+Usage:
+    python -m benchmarks --env development
+    python -m benchmarks --users 200 --posts 5000 --votes 20000 --operations 1000 --concurrency 32
+    python -m benchmarks --scenarios read_post,list_search --save-baseline benchmarks/baseline.json
+    python -m benchmarks --baseline benchmarks/baseline.json --max-regression 0.15
+    python -m benchmarks --url http://127.0.0.1:8000 --skip-seed
+
+The database named by DATABASE_URL of the chosen environment is seeded with
+benchmark users (``bench-N@bench.example.com``); data of a previous run is removed
+first. Without --url the app runs in this process through httpx's ASGI transport,
+including its lifespan. Exits with status 1 when --baseline is given and a
+scenario regressed past --max-regression.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+from pathlib import Path
+
+# Allow running as `python -m benchmarks` from the project root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+async def run(args) -> int:
+    import httpx
+    from sqlmodel import Session, func, select
+
+    from app.main import app
+    from app.models.db_orm import engine
+    from app.models.posts import Posts
+    from app.models.users import User
+
+    from .runner import compare_to_baseline, load_results, print_report, run_scenario, save_results
+    from .scenarios import SCENARIOS, BenchContext, login_user
+    from .seed import BENCH_EMAIL_DOMAIN, seed_database
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+        return 2
+
+    with Session(engine) as session:
+        if args.skip_seed:
+            post_ids = list(session.scalars(select(Posts.id).join(User).where(User.email.like(f"%@{BENCH_EMAIL_DOMAIN}"))))
+            user_count = session.scalar(select(func.count()).select_from(User).where(User.email.like(f"%@{BENCH_EMAIL_DOMAIN}")))
+        else:
+            print(f"Seeding {args.users} users, {args.posts} posts, {args.votes} votes (seed {args.seed})...")
+            seeded = seed_database(session, args.users, args.posts, args.votes, seed=args.seed)
+            post_ids, user_count = seeded["post_ids"], len(seeded["user_ids"])
+    if not post_ids or not user_count:
+        print("No benchmark data found; run without --skip-seed first")
+        return 2
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30)
+        lifespan = None
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30)
+        lifespan = app.router.lifespan_context(app)
+
+    summaries = {}
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            ctx = BenchContext(client=client, post_ids=post_ids, user_count=user_count, rng=random.Random(args.seed))
+            # One token per concurrent worker, so the vote storm toggles under several users
+            ctx.auth_headers = [await login_user(client, i) for i in range(min(user_count, args.concurrency))]
+            for name in names:
+                result = await run_scenario(name, SCENARIOS[name], ctx, args.operations, args.concurrency, args.warmup)
+                summaries[name] = result.summary()
+                if result.first_error:
+                    print(f"{name}: first error: {result.first_error}")
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+
+    baseline = load_results(Path(args.baseline)) if args.baseline else None
+    print()
+    print_report(summaries, baseline)
+
+    run_settings = {key: getattr(args, key) for key in ("users", "posts", "votes", "operations", "concurrency", "seed")}
+    if args.output:
+        save_results(Path(args.output), summaries, run_settings)
+    if args.save_baseline:
+        save_results(Path(args.save_baseline), summaries, run_settings)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if baseline:
+        failures = compare_to_baseline(summaries, baseline, args.max_regression)
+        if failures:
+            print(f"\nRegressions beyond {args.max_regression:.0%}:")
+            for failure in failures:
+                print(f"  - {failure}")
+            return 1
+        print(f"\nNo regressions beyond {args.max_regression:.0%}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Seed a database and benchmark the KPI-One API'
+    )
+    parser.add_argument(
+        '--environment', '--env',
+        dest='environment',
+        # Seeding deletes and inserts rows, so production is deliberately not offered
+        choices=['development', 'staging'],
+        default='development',
+        help='Application environment (default: development)'
+    )
+    parser.add_argument('--users', type=int, default=100, help='Users to seed (default: 100)')
+    parser.add_argument('--posts', type=int, default=1000, help='Posts to seed (default: 1000)')
+    parser.add_argument('--votes', type=int, default=5000, help='Votes to seed (default: 5000)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for data and request mix (default: 42)')
+    parser.add_argument('--skip-seed', action='store_true', help='Reuse the benchmark data of a previous run')
+    parser.add_argument(
+        '--scenarios',
+        default='login,list_search,read_post,vote_storm,post_crud',
+        help='Comma-separated scenarios to run (default: all)'
+    )
+    parser.add_argument('--operations', type=int, default=500, help='Operations per scenario (default: 500)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent clients (default: 16)')
+    parser.add_argument('--warmup', type=int, default=20, help='Untimed operations before each scenario (default: 20)')
+    parser.add_argument('--url', help='Benchmark a running server instead of the in-process app')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--save-baseline', help='Write the results as the baseline JSON to this file')
+    parser.add_argument('--baseline', help='Compare against this baseline JSON')
+    parser.add_argument(
+        '--max-regression',
+        type=float,
+        default=0.2,
+        help='Allowed p95/throughput regression as a fraction (default: 0.2)'
+    )
+
+    args = parser.parse_args()
+
+    # Set APP_ENV before importing the app so the right settings are loaded
+    os.environ['APP_ENV'] = args.environment
+
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == '__main__':
+    main()
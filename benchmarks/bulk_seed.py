@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Bulk-load millions of synthetic users, posts and votes with PostgreSQL COPY.
+
+Usage:
+    python -m benchmarks.bulk_seed --env development --users 100000 --posts 1000000 --votes 5000000
+    python -m benchmarks.bulk_seed --users 1000 --posts 20000 --votes 100000 --skew 1.3 --seed 7
+
+The data is shaped like production rather than uniform:
+- posts per author and votes per post follow a Zipf-like power law (``--skew``)
+- post bodies vary from a sentence to several paragraphs (log-normal word counts)
+- post dates are spread over the last ``--days`` days
+
+Rows go straight through psycopg ``COPY ... FROM STDIN``. Every user shares one
+precomputed Argon2 hash of ``bench-password``, and ``posts.vote_count`` is written
+with its final value, so no per-row work is left for the database. The same
+``--seed`` and volumes always produce the same data (dates are relative to the
+load time). Users get the benchmark email
+domain, so ``python -m benchmarks --skip-seed`` can run against the result, and
+a rerun replaces the previous benchmark data.
+"""
+
+import argparse
+import bisect
+import itertools
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Allow running as `python -m benchmarks.bulk_seed` from the project root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Words drawn once into a long text; post bodies are slices of it, so building a
+# million bodies costs a million slices instead of tens of millions of random picks
+TEXT_POOL_WORDS = 200_000
+
+
+def zipf_cum_weights(n: int, skew: float) -> list[float]:
+    """Cumulative weights of ranks 1..n under weight 1/rank**skew, for bisect sampling."""
+    return list(itertools.accumulate(1 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+def power_law_counts(rng: random.Random, total: int, buckets: int, skew: float, cap: int) -> list[int]:
+    """
+    Split ``total`` into ``buckets`` counts following a power law, each at most ``cap``.
+
+    Bucket ranks are shuffled so the most popular post is not always the first one.
+    """
+    weights = [1 / (rank ** skew) for rank in range(1, buckets + 1)]
+    rng.shuffle(weights)
+    scale = total / sum(weights)
+    counts = [min(cap, int(weight * scale)) for weight in weights]
+    # Hand out what rounding and the cap left over, one vote at a time, to random open buckets
+    shortfall = min(total, cap * buckets) - sum(counts)
+    while shortfall > 0:
+        i = rng.randrange(buckets)
+        if counts[i] < cap:
+            counts[i] += 1
+            shortfall -= 1
+    return counts
+
+
+class TextPool:
+    """Random word-aligned slices of one long pre-generated text."""
+
+    def __init__(self, rng: random.Random, vocabulary, words: int = TEXT_POOL_WORDS):
+        chosen = [rng.choice(vocabulary) for _ in range(words)]
+        self.text = " ".join(chosen)
+        self.starts = list(itertools.accumulate((len(word) + 1 for word in chosen), initial=0))[:-1]
+        self.rng = rng
+
+    def take(self, words: int) -> str:
+        words = min(words, len(self.starts) - 1)
+        first = self.rng.randrange(len(self.starts) - words)
+        return self.text[self.starts[first]:self.starts[first + words] - 1]
+
+
+def _copy_rows(conn, statement: str, rows) -> int:
+    count = 0
+    with conn.cursor() as cursor:
+        with cursor.copy(statement) as copy:
+            for row in rows:
+                copy.write_row(row)
+                count += 1
+    return count
+
+
+def _timed(label: str, fn):
+    started = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - started
+    print(f"   {label:<6} {count:>12,} rows in {elapsed:7.1f}s ({count / max(elapsed, 1e-9):,.0f} rows/s)")
+    return count
+
+
+def bulk_seed(conn, users: int, posts: int, votes: int, seed: int = 42, skew: float = 1.1, days: int = 365) -> dict:
+    """Load the synthetic data through ``conn`` (a psycopg connection) and commit."""
+    # Imported here, not at module level: .seed loads the app settings, which must
+    # only happen after main() has set APP_ENV
+    from app.models.users import hash_password
+    from .seed import BENCH_EMAIL_DOMAIN, BENCH_PASSWORD, WORDS
+
+    rng = random.Random(seed)
+    password_hash = hash_password(BENCH_PASSWORD)
+    now = datetime.utcnow().replace(microsecond=0)
+    span_seconds = days * 86400
+
+    with conn.cursor() as cursor:
+        # Votes and posts of benchmark users go with them (ON DELETE CASCADE)
+        cursor.execute('DELETE FROM "user" WHERE email LIKE %s', (f"%@{BENCH_EMAIL_DOMAIN}",))
+
+    _timed("user", lambda: _copy_rows(
+        conn,
+        'COPY "user" (username, email, password_hash, created_at) FROM STDIN',
+        (
+            (f"bench-{i}", f"bench-{i}@{BENCH_EMAIL_DOMAIN}", password_hash, now - timedelta(seconds=rng.randrange(span_seconds)))
+            for i in range(users)
+        ),
+    ))
+    with conn.cursor() as cursor:
+        user_ids = [row[0] for row in cursor.execute('SELECT id FROM "user" WHERE email LIKE %s ORDER BY id', (f"%@{BENCH_EMAIL_DOMAIN}",))]
+
+    # Vote counts are fixed up front so posts.vote_count is loaded with its final value
+    vote_counts = power_law_counts(rng, votes, posts, skew, cap=users)
+    author_weights = zipf_cum_weights(users, skew)
+    text = TextPool(rng, WORDS)
+
+    def post_rows():
+        for vote_count in vote_counts:
+            owner = user_ids[bisect.bisect_left(author_weights, rng.random() * author_weights[-1])]
+            date = now - timedelta(seconds=rng.randrange(span_seconds))
+            words = max(3, min(1500, int(rng.lognormvariate(3.5, 1.0))))
+            yield (owner, text.take(rng.randint(3, 10)), text.take(words), rng.random() > 0.05, date, vote_count, date)
+
+    _timed("posts", lambda: _copy_rows(
+        conn,
+        "COPY posts (owner_id, title, content, published, date, vote_count, updated_at) FROM STDIN",
+        post_rows(),
+    ))
+    with conn.cursor() as cursor:
+        post_ids = [row[0] for row in cursor.execute(
+            'SELECT p.id FROM posts p JOIN "user" u ON u.id = p.owner_id WHERE u.email LIKE %s ORDER BY p.id',
+            (f"%@{BENCH_EMAIL_DOMAIN}",),
+        )]
+
+    def vote_rows():
+        for post_id, vote_count in zip(post_ids, vote_counts):
+            for user_id in rng.sample(user_ids, vote_count):
+                yield (post_id, user_id, now - timedelta(seconds=rng.randrange(span_seconds)))
+
+    loaded_votes = _timed("votes", lambda: _copy_rows(conn, "COPY votes (post_id, user_id, date) FROM STDIN", vote_rows()))
+    # Fresh statistics so the planner does not treat the new tables as tiny
+    conn.execute('ANALYZE "user", posts, votes')
+    conn.commit()
+    return {"users": len(user_ids), "posts": len(post_ids), "votes": loaded_votes}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Bulk-load synthetic users, posts and votes with COPY'
+    )
+    parser.add_argument(
+        '--environment', '--env',
+        dest='environment',
+        # Loading deletes and inserts rows, so production is deliberately not offered
+        choices=['development', 'staging'],
+        default='development',
+        help='Application environment (default: development)'
+    )
+    parser.add_argument('--users', type=int, default=100_000, help='Users to load (default: 100000)')
+    parser.add_argument('--posts', type=int, default=1_000_000, help='Posts to load (default: 1000000)')
+    parser.add_argument('--votes', type=int, default=5_000_000, help='Votes to load (default: 5000000)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--skew', type=float, default=1.1, help='Power-law exponent for posts per author and votes per post (default: 1.1)')
+    parser.add_argument('--days', type=int, default=365, help='Spread post and vote dates over this many days (default: 365)')
+
+    args = parser.parse_args()
+
+    # Set APP_ENV before importing the app so the right settings are loaded
+    os.environ['APP_ENV'] = args.environment
+
+    from app.models.db_orm import engine
+
+    print(f"📦 Loading {args.users:,} users, {args.posts:,} posts, {args.votes:,} votes (seed {args.seed})")
+    started = time.perf_counter()
+    raw = engine.raw_connection()
+    try:
+        totals = bulk_seed(raw.driver_connection, args.users, args.posts, args.votes, seed=args.seed, skew=args.skew, days=args.days)
+    finally:
+        raw.close()
+    print(f"✓ Loaded {sum(totals.values()):,} rows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from .scenarios import BenchContext
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    operations: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    first_error: Optional[str] = None
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+        return {
+            "operations": self.operations,
+            "errors": self.errors,
+            "throughput": round(self.operations / self.seconds, 2) if self.seconds else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        }
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0 for an empty list)."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+async def run_scenario(
+    name: str,
+    operation: Callable[[BenchContext], Awaitable[None]],
+    ctx: BenchContext,
+    operations: int,
+    concurrency: int,
+    warmup: int = 0,
+) -> ScenarioResult:
+    """Run ``operations`` calls of ``operation`` with ``concurrency`` workers and time each one."""
+    for _ in range(warmup):
+        try:
+            await operation(ctx)
+        except Exception:
+            pass
+
+    result = ScenarioResult(name)
+    remaining = operations
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                await operation(ctx)
+            except Exception as e:
+                result.errors += 1
+                result.first_error = result.first_error or f"{type(e).__name__}: {e}"
+            else:
+                result.latencies.append(time.perf_counter() - started)
+            result.operations += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def print_report(summaries: dict[str, dict], baseline: Optional[dict] = None) -> None:
+    print(f"{'scenario':<14}{'ops':>7}{'errors':>8}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, summary in summaries.items():
+        print(
+            f"{name:<14}{summary['operations']:>7}{summary['errors']:>8}{summary['throughput']:>10.1f}"
+            f"{summary['p50_ms']:>10.2f}{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}"
+        )
+        if baseline and name in baseline:
+            base = baseline[name]
+            print(
+                f"{'  vs baseline':<29}{_change(summary['throughput'], base['throughput']):>10}"
+                f"{_change(summary['p50_ms'], base['p50_ms']):>10}{_change(summary['p95_ms'], base['p95_ms']):>10}"
+                f"{_change(summary['p99_ms'], base['p99_ms']):>10}"
+            )
+
+
+def _change(current: float, base: float) -> str:
+    if not base:
+        return "-"
+    return f"{(current - base) / base * 100:+.0f}%"
+
+
+def compare_to_baseline(summaries: dict[str, dict], baseline: dict, max_regression: float) -> list[str]:
+    """
+    Return a message per scenario that regressed past ``max_regression`` (a fraction).
+
+    A scenario regresses when its p95 latency rose, or its throughput fell, by more
+    than that fraction, or when it has errors and the baseline had none.
+    """
+    failures = []
+    for name, summary in summaries.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and summary["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            failures.append(f"{name}: p95 {summary['p95_ms']} ms vs baseline {base['p95_ms']} ms")
+        if base["throughput"] and summary["throughput"] < base["throughput"] * (1 - max_regression):
+            failures.append(f"{name}: throughput {summary['throughput']} ops/s vs baseline {base['throughput']} ops/s")
+        if summary["errors"] and not base["errors"]:
+            failures.append(f"{name}: {summary['errors']} errors (baseline had none)")
+    return failures
+
+
+def load_results(path: Path) -> dict:
+    return json.loads(path.read_text())["scenarios"]
+
+
+def save_results(path: Path, summaries: dict[str, dict], settings: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"settings": settings, "scenarios": summaries}, indent=2) + "\n")
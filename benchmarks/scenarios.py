@@ -0,0 +1,92 @@
+import random
+from dataclasses import dataclass, field
+
+import httpx
+
+from .seed import BENCH_PASSWORD, WORDS, bench_email
+
+
+class UnexpectedStatus(Exception):
+    pass
+
+
+@dataclass
+class BenchContext:
+    """State shared by scenario operations: the HTTP client, logged-in users and seeded posts."""
+
+    client: httpx.AsyncClient
+    post_ids: list[int]
+    user_count: int
+    rng: random.Random
+    auth_headers: list[dict] = field(default_factory=list)
+
+    def any_user(self) -> dict:
+        return self.rng.choice(self.auth_headers)
+
+
+def _expect(response: httpx.Response, *codes: int) -> httpx.Response:
+    if response.status_code not in codes:
+        raise UnexpectedStatus(f"{response.request.method} {response.request.url.path} -> {response.status_code}")
+    return response
+
+
+async def login_user(client: httpx.AsyncClient, index: int) -> dict:
+    response = _expect(
+        await client.post("/auth/login", data={"username": bench_email(index), "password": BENCH_PASSWORD}), 200
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def login(ctx: BenchContext):
+    """POST /auth/login for a random seeded user (Argon2 verify + token issue)."""
+    await login_user(ctx.client, ctx.rng.randrange(ctx.user_count))
+
+
+async def list_search(ctx: BenchContext):
+    """Authenticated GET /posts?search= with a word that occurs in seeded titles."""
+    params = {"search": ctx.rng.choice(WORDS), "limit": 20}
+    _expect(await ctx.client.get("/posts/", params=params, headers=ctx.any_user()), 200)
+
+
+async def read_post(ctx: BenchContext):
+    """GET /posts/{id} for a random seeded post."""
+    _expect(await ctx.client.get(f"/posts/{ctx.rng.choice(ctx.post_ids)}", headers=ctx.any_user()), 200)
+
+
+async def vote_storm(ctx: BenchContext):
+    """Toggle a vote on one of a handful of hot posts: vote, or remove the vote if one exists."""
+    headers = ctx.any_user()
+    post_id = ctx.post_ids[ctx.rng.randrange(min(5, len(ctx.post_ids)))]
+    # 409 also when a concurrent toggle by the same user cast the vote first
+    response = _expect(await ctx.client.post("/votes/", json={"post_id": post_id, "direction": 1}, headers=headers), 201, 409)
+    if response.status_code == 409:
+        # 404 when a concurrent toggle by the same user removed it first
+        _expect(await ctx.client.post("/votes/", json={"post_id": post_id, "direction": 0}, headers=headers), 201, 404)
+
+
+async def post_crud(ctx: BenchContext):
+    """Create a post, look it up, update and delete it (four requests per operation).
+
+    Under concurrency the newest post may belong to another operation; its update and
+    delete then get 403/404, which is accepted. Leftover posts belong to benchmark
+    users and are removed with them on the next seed.
+    """
+    headers = ctx.any_user()
+    body = {"title": "bench crud", "content": "created by the benchmark", "published": True}
+    _expect(await ctx.client.post("/posts/", json=body, headers=headers), 201)
+    # POST /posts does not return the id; the newest post of the list is ours unless another op raced
+    newest = _expect(await ctx.client.get("/posts/", params={"limit": 1}), 200).json()
+    if not newest:
+        return
+    post_id = newest[0]["Posts"]["id"]
+    _expect(await ctx.client.put(f"/posts/{post_id}", json={**body, "title": "bench crud updated"}, headers=headers), 200, 403, 404)
+    _expect(await ctx.client.delete(f"/posts/{post_id}", headers=headers), 204, 403, 404)
+
+
+SCENARIOS = {
+    "login": login,
+    "list_search": list_search,
+    "read_post": read_post,
+    "vote_storm": vote_storm,
+    "post_crud": post_crud,
+}
@@ -0,0 +1,67 @@
+import random
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session
+
+from app.models.posts import Posts, reconcile_vote_counts
+from app.models.users import User, hash_password
+from app.models.votes import Votes
+
+# Every benchmark user has an address in this domain, so a rerun can remove the previous data
+BENCH_EMAIL_DOMAIN = "bench.example.com"
+BENCH_PASSWORD = "bench-password"
+
+WORDS = (
+    "revenue", "latency", "forecast", "quarter", "pipeline", "churn", "margin", "growth",
+    "backlog", "release", "incident", "budget", "hiring", "roadmap", "customer", "retention",
+)
+
+
+def bench_email(index: int) -> str:
+    return f"bench-{index}@{BENCH_EMAIL_DOMAIN}"
+
+
+def random_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def clear_bench_data(session: Session) -> int:
+    """Delete benchmark users; their posts and votes go with them (ON DELETE CASCADE)."""
+    result = session.execute(delete(User).where(User.email.like(f"%@{BENCH_EMAIL_DOMAIN}")))
+    session.commit()
+    return result.rowcount
+
+
+def seed_database(session: Session, users: int, posts: int, votes: int, seed: int = 42) -> dict:
+    """
+    Insert ``users`` users, ``posts`` posts and ``votes`` distinct votes.
+
+    The same arguments always produce the same titles, owners and vote pairs. All
+    users share one password hash (``BENCH_PASSWORD``) so seeding does not pay for
+    Argon2 per user. Returns the new user and post ids.
+    """
+    rng = random.Random(seed)
+    clear_bench_data(session)
+    password_hash = hash_password(BENCH_PASSWORD)
+
+    user_ids = session.scalars(
+        insert(User).returning(User.id),
+        [{"username": f"bench-{i}", "email": bench_email(i), "password_hash": password_hash} for i in range(users)],
+    ).all()
+    post_ids = session.scalars(
+        insert(Posts).returning(Posts.id),
+        [
+            {"owner_id": rng.choice(user_ids), "title": random_text(rng, 4), "content": random_text(rng, 30), "published": True}
+            for _ in range(posts)
+        ],
+    ).all()
+
+    pairs = set()
+    target = min(votes, len(user_ids) * len(post_ids))
+    while len(pairs) < target:
+        pairs.add((rng.choice(post_ids), rng.choice(user_ids)))
+    if pairs:
+        session.execute(insert(Votes), [{"post_id": post_id, "user_id": user_id} for post_id, user_id in sorted(pairs)])
+    session.commit()
+    reconcile_vote_counts(session)
+    return {"user_ids": list(user_ids), "post_ids": list(post_ids), "votes": len(pairs)}
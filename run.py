@@ -6,11 +6,107 @@ Usage:
     python run.py --environment development --reload
     python run.py --env production --host 0.0.0.0 --port 8000
     python run.py --env staging --workers 4
+    python run.py --env production --production --host 0.0.0.0 --workers 8 --max-requests 10000 --reuse-port
 """
 
 import argparse
+import gc
 import os
 import sys
+import tempfile
+from pathlib import Path
+
+
+def prepare_metrics_dir():
+    """Give the workers an empty shared directory for Prometheus multiprocess metrics."""
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        Path(metrics_dir).mkdir(parents=True, exist_ok=True)
+        # Samples of a previous run would be merged into the new one
+        for stale in Path(metrics_dir).glob('*.db'):
+            stale.unlink()
+    else:
+        metrics_dir = tempfile.mkdtemp(prefix='kpi-one-metrics-')
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = metrics_dir
+    print(f"   Metrics dir: {metrics_dir}")
+
+
+def pick_loop_and_http():
+    """Prefer uvloop and httptools (both in uvicorn[standard]); fall back to the pure-Python ones."""
+    try:
+        import uvloop  # noqa: F401
+        loop = 'uvloop'
+    except ImportError:
+        loop = 'asyncio'
+    try:
+        import httptools  # noqa: F401
+        http = 'httptools'
+    except ImportError:
+        http = 'h11'
+    return loop, http
+
+
+def run_production(args):
+    """
+    Serve through gunicorn's arbiter with Uvicorn workers.
+
+    The app is imported once in the master and gc.freeze() moves everything it
+    allocated out of the collector's reach before forking, so workers share those
+    pages copy-on-write instead of each importing the app. Workers are recycled
+    after --max-requests (+ random jitter) and drain in-flight requests for up to
+    --graceful-timeout seconds.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("Error: --production needs gunicorn. Install it with: pip install gunicorn uvicorn-worker")
+        sys.exit(1)
+    try:
+        from uvicorn_worker import UvicornWorker
+    except ImportError:
+        # Older uvicorn releases ship the worker themselves
+        from uvicorn.workers import UvicornWorker
+
+    loop, http = pick_loop_and_http()
+    print(f"   Mode: production (preload, loop={loop}, http={http})")
+
+    class Worker(UvicornWorker):
+        CONFIG_KWARGS = {'loop': loop, 'http': http}
+
+    def when_ready(server):
+        # Everything imported so far is long-lived; keep the GC from touching (and un-sharing) it
+        gc.freeze()
+        print(f"   Froze {gc.get_freeze_count()} objects before forking workers")
+
+    def post_fork(server, worker):
+        from app.main import reset_startup_clock
+        from app.models.db_orm import dispose_inherited_pools
+        dispose_inherited_pools()
+        reset_startup_clock()
+
+    class ProductionServer(BaseApplication):
+        def load_config(self):
+            options = {
+                'bind': f'{args.host}:{args.port}',
+                'workers': args.workers,
+                'worker_class': Worker,
+                'preload_app': True,
+                'max_requests': args.max_requests,
+                'max_requests_jitter': args.max_requests_jitter,
+                'graceful_timeout': args.graceful_timeout,
+                'reuse_port': args.reuse_port,
+                'loglevel': 'debug' if args.log_level == 'trace' else args.log_level,
+                'when_ready': when_ready,
+                'post_fork': post_fork,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    ProductionServer().run()
 
 
 def main():
@@ -50,6 +146,34 @@ def main():
         default=1,
         help='Number of worker processes (default: 1, ignored with --reload)'
     )
+    parser.add_argument(
+        '--production',
+        action='store_true',
+        help='Preload the app, freeze it for copy-on-write and serve through gunicorn + uvloop/httptools'
+    )
+    parser.add_argument(
+        '--max-requests',
+        type=int,
+        default=0,
+        help='With --production: recycle a worker after this many requests (default: 0 = never)'
+    )
+    parser.add_argument(
+        '--max-requests-jitter',
+        type=int,
+        default=None,
+        help='With --production: random extra requests per worker so they do not all restart together (default: 10%% of --max-requests)'
+    )
+    parser.add_argument(
+        '--graceful-timeout',
+        type=int,
+        default=30,
+        help='With --production: seconds a recycled or stopping worker gets to finish requests (default: 30)'
+    )
+    parser.add_argument(
+        '--reuse-port',
+        action='store_true',
+        help='With --production: bind with SO_REUSEPORT so a new server can start on the same port before the old one stops'
+    )
     parser.add_argument(
         '--log-level',
         choices=['critical', 'error', 'warning', 'info', 'debug', 'trace'],
@@ -58,6 +182,10 @@ def main():
     )
     
     args = parser.parse_args()
+    if args.production and args.reload:
+        parser.error('--production cannot be combined with --reload')
+    if args.max_requests_jitter is None:
+        args.max_requests_jitter = args.max_requests // 10
     
     # Set APP_ENV environment variable before importing the app
     os.environ['APP_ENV'] = args.environment
@@ -70,6 +198,13 @@ def main():
         print(f"   Workers: {args.workers}")
     print()
     
+    if not args.reload and args.workers > 1:
+        prepare_metrics_dir()
+    
+    if args.production:
+        run_production(args)
+        return
+    
     # Import uvicorn after setting environment variable
     try:
         import uvicorn
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Measure the per-row cost of serializing GET /posts rows to JSON.
+
+Usage:
+    python scripts/bench_serialization.py
+    python scripts/bench_serialization.py --rows 1000 --repeat 20
+
+Builds in-memory rows shaped like get_posts_with_votes() results (no database
+needed), times validating them into PostOutWithVotes, then times each way of
+encoding the validated models into a response body:
+
+  fastapi-classic  jsonable_encoder + json.dumps (FastAPI's default
+                   path before it learned to dump JSON through pydantic)
+  orjson           dump_python + orjson.dumps (what ORJSONResponse does)
+  dump-json        TypeAdapter.dump_json (FAST_JSON_RESPONSES=true and
+                   the post response cache)
+
+The app settings are only imported, but config/.env.<APP_ENV> must still load.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Allow running as `python scripts/bench_serialization.py` from the project root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('APP_ENV', 'development')
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.posts import Posts
+from app.models.users import User
+from app.schemas.posts import PostOutWithVotes
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Row = namedtuple('Row', ['Posts', 'votes'])
+
+
+def build_rows(count: int) -> list:
+    """Return ``count`` rows with a loaded owner, like the list query produces."""
+    owner = User(id=1, username='bench', email='bench@example.com', password_hash='x', created_at=datetime(2024, 1, 1))
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        post = Posts(
+            id=i + 1,
+            owner_id=owner.id,
+            title=f'Post {i}',
+            content='Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 4,
+            published=True,
+            date=start + timedelta(minutes=i),
+            vote_count=i % 50,
+            updated_at=start + timedelta(minutes=i),
+        )
+        post.owner = owner
+        rows.append(Row(post, i % 50))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare JSON serialization paths for post list responses'
+    )
+    parser.add_argument('--rows', type=int, default=100, help='Rows per response (default: 100)')
+    parser.add_argument('--repeat', type=int, default=50, help='Timed runs per path (default: 50)')
+
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(list[PostOutWithVotes])
+    rows = build_rows(args.rows)
+
+    def validate():
+        return adapter.validate_python(rows, from_attributes=True)
+
+    validated = validate()
+    paths = {
+        'fastapi-classic': lambda: json.dumps(jsonable_encoder(validated)).encode(),
+        'dump-json': lambda: adapter.dump_json(validated),
+    }
+    if orjson is not None:
+        paths['orjson'] = lambda: orjson.dumps(adapter.dump_python(validated))
+    else:
+        print('orjson is not installed; skipping the orjson path')
+
+    def median_seconds(fn) -> float:
+        fn()  # warm up
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
+
+    validate_s = median_seconds(validate)
+    print(f'{args.rows} rows per response, median of {args.repeat} runs')
+    print(f'validating ORM rows (shared by every path): {validate_s / args.rows * 1e6:.1f} us/row\n')
+    print(f"{'path':<18}{'encode/row':>12}{'total/row':>12}{'speedup':>10}")
+    baseline = None
+    for name, fn in paths.items():
+        encode_s = median_seconds(fn)
+        baseline = baseline or encode_s
+        total = (validate_s + encode_s) / args.rows * 1e6
+        print(f'{name:<18}{encode_s / args.rows * 1e6:>9.1f} us{total:>9.1f} us{baseline / encode_s:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark Argon2 on this machine and print hasher settings for a target verify latency.
+
+Usage:
+    python scripts/calibrate_argon2.py --target-ms 50
+    python scripts/calibrate_argon2.py --target-ms 100 --memory-cost 131072 --parallelism 2
+
+The memory cost is halved (down to --min-memory-cost) until time_cost=1 fits the
+target, then the time cost is raised as long as the median verify time stays
+within the target.
+
+Paste the printed ARGON2_* lines into config/.env.<environment>. Existing hashes
+are upgraded transparently on the next successful login.
+"""
+
+import argparse
+import statistics
+import time
+
+try:
+    from argon2 import PasswordHasher
+except ImportError:
+    print("Error: argon2-cffi is not installed. Install it with: pip install argon2-cffi")
+    raise SystemExit(1)
+
+
+def measure_verify_ms(time_cost: int, memory_cost: int, parallelism: int, samples: int) -> float:
+    """Return the median verify latency in milliseconds for the given parameters."""
+    ph = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    hashed = ph.hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        ph.verify(hashed, "calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, memory_cost: int, parallelism: int, min_memory_cost: int,
+              max_time_cost: int, samples: int) -> tuple[int, int, int, float]:
+    """Find the most expensive (time_cost, memory_cost) whose verify latency stays within target_ms."""
+    while True:
+        latency = measure_verify_ms(1, memory_cost, parallelism, samples)
+        print(f"  t=1 m={memory_cost} p={parallelism}: {latency:.1f} ms")
+        if latency <= target_ms or memory_cost // 2 < min_memory_cost:
+            break
+        memory_cost //= 2
+
+    time_cost = 1
+    while time_cost < max_time_cost:
+        next_latency = measure_verify_ms(time_cost + 1, memory_cost, parallelism, samples)
+        print(f"  t={time_cost + 1} m={memory_cost} p={parallelism}: {next_latency:.1f} ms")
+        if next_latency > target_ms:
+            break
+        time_cost += 1
+        latency = next_latency
+
+    return time_cost, memory_cost, parallelism, latency
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Calibrate Argon2 cost parameters for KPI-One on this machine'
+    )
+    parser.add_argument(
+        '--target-ms',
+        type=float,
+        default=50.0,
+        help='Target median verify latency in milliseconds (default: 50)'
+    )
+    parser.add_argument(
+        '--memory-cost',
+        type=int,
+        default=65536,
+        help='Starting memory cost in KiB (default: 65536)'
+    )
+    parser.add_argument(
+        '--min-memory-cost',
+        type=int,
+        default=19456,
+        help='Never go below this memory cost in KiB (default: 19456, OWASP minimum)'
+    )
+    parser.add_argument(
+        '--parallelism',
+        type=int,
+        default=4,
+        help='Parallelism / lanes (default: 4)'
+    )
+    parser.add_argument(
+        '--max-time-cost',
+        type=int,
+        default=20,
+        help='Upper bound for the time cost search (default: 20)'
+    )
+    parser.add_argument(
+        '--samples',
+        type=int,
+        default=7,
+        help='Verify calls per measurement (default: 7)'
+    )
+    
+    args = parser.parse_args()
+    
+    print(f"Calibrating Argon2 for a {args.target_ms:.0f} ms verify target...")
+    time_cost, memory_cost, parallelism, latency = calibrate(
+        target_ms=args.target_ms,
+        memory_cost=args.memory_cost,
+        parallelism=args.parallelism,
+        min_memory_cost=args.min_memory_cost,
+        max_time_cost=args.max_time_cost,
+        samples=args.samples,
+    )
+    
+    print(f"\n✓ Median verify latency: {latency:.1f} ms")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_PARALLELISM={parallelism}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Backfill / repair the denormalized posts.vote_count column from the votes table.
+
+Usage:
+    python scripts/reconcile_vote_counts.py --env production --dry-run
+    python scripts/reconcile_vote_counts.py --env production
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Allow running as `python scripts/reconcile_vote_counts.py` from the project root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Reconcile posts.vote_count with the votes table'
+    )
+    parser.add_argument(
+        '--environment', '--env',
+        dest='environment',
+        choices=['development', 'staging', 'production'],
+        default='development',
+        help='Application environment (default: development)'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Only report how many posts have drifted'
+    )
+    
+    args = parser.parse_args()
+    
+    # Set APP_ENV before importing the app so the right settings are loaded
+    os.environ['APP_ENV'] = args.environment
+    
+    from sqlmodel import Session
+    from app.models.db_orm import engine
+    from app.models.posts import reconcile_vote_counts
+    
+    with Session(engine) as session:
+        drifted = reconcile_vote_counts(session, dry_run=args.dry_run)
+    
+    if args.dry_run:
+        print(f"{drifted} post(s) have a vote_count that differs from the votes table")
+    else:
+        print(f"✓ Repaired vote_count on {drifted} post(s)")
+
+
+if __name__ == '__main__':
+    main()